@@ -8,6 +8,13 @@ import click
 import yaml
 from dotenv import load_dotenv
 
+try:
+    from yaml import CSafeDumper as _YamlDumper
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+    from yaml import SafeLoader as _YamlLoader
+
 from trello_sync.services.trello_sync import TrelloSync
 from trello_sync.utils.config import (
     ConfigError,
@@ -33,11 +40,17 @@ def cli() -> None:
 @click.option('--board-name', help='Board name (optional, will fetch if not provided)')
 @click.option('--workspace-name', help='Workspace name (optional, will fetch if not provided)')
 @click.option('--dry-run', is_flag=True, help='Show what would be synced without making changes')
+@click.option(
+    '--conditional',
+    is_flag=True,
+    help='Use ETag conditional requests so unchanged Trello data is not re-downloaded',
+)
 def sync(
     board_id: str | None,
     board_name: str | None,
     workspace_name: str | None,
     dry_run: bool,
+    conditional: bool,
 ) -> None:
     """Sync board(s) to local files.
     
@@ -49,14 +62,18 @@ def sync(
         board_name: Optional board name.
         workspace_name: Optional workspace name.
         dry_run: If True, show what would be synced without making changes.
+        conditional: If True, reuse cached responses for data Trello reports unchanged.
     """
     try:
-        sync_client = TrelloSync()
-        
         if board_id:
             # Sync specific board
             click.echo(f"Syncing board: {board_id}")
-            stats = sync_client.sync_board(board_id, board_name, workspace_name, dry_run)
+            if TrelloSync.is_board_enabled(board_id):
+                sync_client = TrelloSync(conditional=conditional)
+                stats = sync_client.sync_board(board_id, board_name, workspace_name, dry_run)
+            else:
+                # Not configured or disabled - nothing to sync, no session needed
+                stats = {'total_cards': 0, 'synced_cards': 0, 'skipped_cards': 0}
             
             click.echo(f"\n{'='*50}")
             click.echo(f"Sync complete!")
@@ -74,6 +91,7 @@ def sync(
                 click.echo("Enable boards in trello-sync.yaml or provide a board_id.")
                 return
             
+            sync_client = TrelloSync(conditional=conditional)
             click.echo(f"Syncing {len(enabled_boards)} enabled board(s) from configuration...\n")
             
             total_stats = {
@@ -171,7 +189,7 @@ def config() -> None:
         
         # Show Obsidian root
         try:
-            obsidian_root = get_obsidian_root()
+            obsidian_root = get_obsidian_root(config)
             click.echo(f"Obsidian Root: {obsidian_root}")
         except ConfigError as e:
             click.echo(f"Obsidian Root: Not configured ({e})")
@@ -234,7 +252,7 @@ def config_add(
         # Load existing config
         if config_path.exists():
             with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f) or {}
+                config = yaml.load(f, Loader=_YamlLoader) or {}
         else:
             config = {
                 'obsidian_root': None,
@@ -297,7 +315,9 @@ def config_add(
         # Write config file
         config_path.parent.mkdir(parents=True, exist_ok=True)
         with open(config_path, 'w', encoding='utf-8') as f:
-            yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+            yaml.dump(
+                config, f, Dumper=_YamlDumper, default_flow_style=False, sort_keys=False
+            )
         
         click.echo(f"Configuration saved to {config_path}")
         
@@ -307,207 +327,224 @@ def config_add(
         raise click.ClickException(f"Error adding config: {e}")
 
 
-@cli.command()
-@click.option('--force', is_flag=True, help='Overwrite existing configuration (use with caution)')
-def config_init(force: bool) -> None:
+def config_init_impl(force: bool = False) -> Path:
     """Initialize or update trello-sync.yaml with all accessible boards.
     
-    This command:
-    - Fetches all boards accessible to your Trello account
-    - If config file exists: adds missing boards, removes deleted boards, preserves existing settings
-    - If config file doesn't exist: creates it with all boards (enabled: false by default)
-    
-    Existing board configurations (enabled, target_path, etc.) are preserved.
+    Worker behind the config-init command, callable without going through Click.
+
+    Args:
+        force: Overwrite the existing file instead of merging into it.
+
+    Returns:
+        Path of the written config file.
     """
-    try:
-        config_path = get_config_path()
-        sync_client = TrelloSync()
+    config_path = get_config_path()
+    sync_client = TrelloSync()
+    
+    click.echo("Fetching boards from Trello...")
+    all_boards = sync_client.get_boards()
+    click.echo(f"Found {len(all_boards)} accessible boards\n")
+    
+    # Create board lookup by ID
+    trello_board_dict = {board['id']: board for board in all_boards}
+    trello_board_ids = set(trello_board_dict.keys())
+    
+    # Load existing config or create new
+    config_exists = config_path.exists()
+    
+    if config_exists and not force:
+        config = load_config()
+        existing_boards = config.get('boards') or []
         
-        click.echo("Fetching boards from Trello...")
-        all_boards = sync_client.get_boards()
-        click.echo(f"Found {len(all_boards)} accessible boards\n")
+        # Create lookup of existing board configs
+        existing_board_dict = {}
+        for board_config in existing_boards:
+            board_id = board_config.get('board_id')
+            if board_id:
+                existing_board_dict[board_id] = board_config
         
-        # Create board lookup by ID
-        trello_board_dict = {board['id']: board for board in all_boards}
-        trello_board_ids = set(trello_board_dict.keys())
+        existing_board_ids = set(existing_board_dict.keys())
         
-        # Load existing config or create new
-        config_exists = config_path.exists()
+        # Find boards to add (in Trello but not in config)
+        boards_to_add = trello_board_ids - existing_board_ids
+        # Find boards to remove (in config but not in Trello)
+        boards_to_remove = existing_board_ids - trello_board_ids
         
-        if config_exists and not force:
-            config = load_config()
-            existing_boards = config.get('boards') or []
-            
-            # Create lookup of existing board configs
-            existing_board_dict = {}
-            for board_config in existing_boards:
-                board_id = board_config.get('board_id')
-                if board_id:
-                    existing_board_dict[board_id] = board_config
-            
-            existing_board_ids = set(existing_board_dict.keys())
-            
-            # Find boards to add (in Trello but not in config)
-            boards_to_add = trello_board_ids - existing_board_ids
-            # Find boards to remove (in config but not in Trello)
-            boards_to_remove = existing_board_ids - trello_board_ids
-            
-            click.echo(f"Existing boards in config: {len(existing_board_ids)}")
-            click.echo(f"Boards to add: {len(boards_to_add)}")
-            click.echo(f"Boards to remove: {len(boards_to_remove)}\n")
-            
-            # Update existing boards with latest info (name, org) while preserving settings
-            updated_count = 0
-            for board_id, board_config in existing_board_dict.items():
-                if board_id in trello_board_dict:
-                    trello_board = trello_board_dict[board_id]
-                    board_details = sync_client.get_board(board_id)
-                    
-                    # Update board_name and org if changed
-                    new_name = trello_board.get('name', '')
-                    org = board_details.get('organization', {})
-                    org_name = org.get('displayName', '') if org else ''
-                    
-                    if board_config.get('board_name') != new_name:
-                        board_config['board_name'] = new_name
-                        updated_count += 1
-                    
-                    if board_config.get('org') != org_name:
-                        board_config['org'] = org_name
-                        updated_count += 1
-                    
-                    # Ensure workspace_name is set (for backward compatibility)
-                    if 'workspace_name' not in board_config:
-                        board_config['workspace_name'] = org_name
-            
-            # Add new boards
-            new_boards = []
-            for board_id in sorted(boards_to_add):
+        click.echo(f"Existing boards in config: {len(existing_board_ids)}")
+        click.echo(f"Boards to add: {len(boards_to_add)}")
+        click.echo(f"Boards to remove: {len(boards_to_remove)}\n")
+        
+        # Update existing boards with latest info (name, org) while preserving settings
+        updated_count = 0
+        for board_id, board_config in existing_board_dict.items():
+            if board_id in trello_board_dict:
                 trello_board = trello_board_dict[board_id]
                 board_details = sync_client.get_board(board_id)
                 
+                # Update board_name and org if changed
+                new_name = trello_board.get('name', '')
                 org = board_details.get('organization', {})
                 org_name = org.get('displayName', '') if org else ''
                 
-                new_board = {
-                    'board_id': board_id,
-                    'board_name': trello_board.get('name', 'Unknown'),
-                    'enabled': False,
-                    'target_path': '20_tasks/Trello/{org}/{board}/{column}/{card}.md',
-                    'org': org_name,
-                    'workspace_name': org_name,  # For backward compatibility
-                }
-                new_boards.append(new_board)
-            
-            # Build final boards list: existing (updated) + new, excluding removed
-            final_boards = []
-            for board_id in sorted(trello_board_ids):
-                if board_id in existing_board_dict:
-                    final_boards.append(existing_board_dict[board_id])
-                elif board_id in boards_to_add:
-                    # Find the new board we just created
-                    new_board = next(b for b in new_boards if b['board_id'] == board_id)
-                    final_boards.append(new_board)
-            
-            config['boards'] = final_boards
-            
-            click.echo(f"Updated {updated_count} existing board(s)")
-            click.echo(f"Added {len(boards_to_add)} new board(s)")
-            if boards_to_remove:
-                click.echo(f"Removed {len(boards_to_remove)} deleted board(s)")
-            click.echo()
-            
-        else:
-            # Create new config file
-            click.echo("Creating new configuration file...\n")
-            
-            config = {
-                'obsidian_root': None,
-                'default_assets_folder': '.local_assets/Trello',
-                'boards': [],
-            }
-            
-            # Fetch details for all boards
-            boards = []
-            for i, board in enumerate(sorted(all_boards, key=lambda b: b.get('name', '')), 1):
-                board_id = board['id']
-                board_name = board.get('name', 'Unknown')
-                
-                click.echo(f"[{i}/{len(all_boards)}] Fetching details for: {board_name}")
-                board_details = sync_client.get_board(board_id)
+                if board_config.get('board_name') != new_name:
+                    board_config['board_name'] = new_name
+                    updated_count += 1
                 
-                org = board_details.get('organization', {})
-                org_name = org.get('displayName', '') if org else ''
+                if board_config.get('org') != org_name:
+                    board_config['org'] = org_name
+                    updated_count += 1
                 
-                boards.append({
-                    'board_id': board_id,
-                    'board_name': board_name,
-                    'enabled': False,
-                    'target_path': '20_tasks/Trello/{org}/{board}/{column}/{card}.md',
-                    'org': org_name,
-                    'workspace_name': org_name,  # For backward compatibility
-                })
+                # Ensure workspace_name is set (for backward compatibility)
+                if 'workspace_name' not in board_config:
+                    board_config['workspace_name'] = org_name
+        
+        # Add new boards
+        new_boards = []
+        for board_id in sorted(boards_to_add):
+            trello_board = trello_board_dict[board_id]
+            board_details = sync_client.get_board(board_id)
             
-            config['boards'] = boards
-            click.echo()
+            org = board_details.get('organization', {})
+            org_name = org.get('displayName', '') if org else ''
+            
+            new_board = {
+                'board_id': board_id,
+                'board_name': trello_board.get('name', 'Unknown'),
+                'enabled': False,
+                'target_path': '20_tasks/Trello/{org}/{board}/{column}/{card}.md',
+                'org': org_name,
+                'workspace_name': org_name,  # For backward compatibility
+            }
+            new_boards.append(new_board)
+        
+        # Build final boards list: existing (updated) + new, excluding removed
+        final_boards = []
+        for board_id in sorted(trello_board_ids):
+            if board_id in existing_board_dict:
+                final_boards.append(existing_board_dict[board_id])
+            elif board_id in boards_to_add:
+                # Find the new board we just created
+                new_board = next(b for b in new_boards if b['board_id'] == board_id)
+                final_boards.append(new_board)
         
-        # Write config file with proper formatting
-        config_path.parent.mkdir(parents=True, exist_ok=True)
+        config['boards'] = final_boards
         
-        # Prepare YAML content with comments
-        yaml_content = "# Trello Sync Configuration\n"
-        yaml_content += "# Copy this file to trello-sync.yaml and configure your boards\n\n"
-        yaml_content += "# Global settings\n"
+        click.echo(f"Updated {updated_count} existing board(s)")
+        click.echo(f"Added {len(boards_to_add)} new board(s)")
+        if boards_to_remove:
+            click.echo(f"Removed {len(boards_to_remove)} deleted board(s)")
+        click.echo()
         
-        # Write global settings
-        if config.get('obsidian_root'):
-            yaml_content += f"obsidian_root: {config['obsidian_root']}\n"
-        else:
-            yaml_content += "obsidian_root: null  # Optional, defaults to OBSIDIAN_ROOT env var\n"
-        
-        yaml_content += f"default_assets_folder: {config.get('default_assets_folder', '.local_assets/Trello')}\n\n"
-        
-        # Write board mappings with comments
-        yaml_content += "# Board mappings\n"
-        yaml_content += "# Available settings for each board:\n"
-        yaml_content += "#   board_id: (required) Trello board ID\n"
-        yaml_content += "#   board_name: (optional) Board name for reference\n"
-        yaml_content += "#   org: (optional) Organization/workspace name for reference\n"
-        yaml_content += "#   enabled: (required) true/false to enable/disable syncing\n"
-        yaml_content += "#   target_path: (required) Path template for card files\n"
-        yaml_content += "#   assets_folder: (optional) Override default assets folder\n"
-        yaml_content += "#   workspace_name: (optional) Workspace name for {org} substitution (deprecated, use 'org')\n"
-        yaml_content += "#\n"
-        yaml_content += "# Path template variables:\n"
-        yaml_content += "#   {org}   - Workspace/organization name (sanitized)\n"
-        yaml_content += "#   {board} - Board name (sanitized)\n"
-        yaml_content += "#   {column} - List/column name (sanitized)\n"
-        yaml_content += "#   {card}  - Card name (sanitized, without .md extension)\n"
-        yaml_content += "boards:\n"
-        
-        # Write each board with proper indentation
-        for board in config.get('boards', []):
-            yaml_content += f"  - board_id: \"{board['board_id']}\"\n"
-            if board.get('board_name'):
-                yaml_content += f"    board_name: \"{board['board_name']}\"\n"
-            # Always include org field (even if empty) for consistency
-            org_value = board.get('org', '')
-            yaml_content += f"    org: \"{org_value}\"\n"
-            yaml_content += f"    enabled: {str(board.get('enabled', False)).lower()}\n"
-            yaml_content += f"    target_path: \"{board.get('target_path', '20_tasks/Trello/{org}/{board}/{column}/{card}.md')}\"\n"
-            if board.get('workspace_name'):
-                yaml_content += f"    workspace_name: \"{board['workspace_name']}\"\n"
-            if board.get('assets_folder'):
-                yaml_content += f"    assets_folder: \"{board['assets_folder']}\"\n"
-            yaml_content += "\n"
-        
-        # Write to file
-        with open(config_path, 'w', encoding='utf-8') as f:
-            f.write(yaml_content)
+    else:
+        # Create new config file
+        click.echo("Creating new configuration file...\n")
         
-        click.echo(f"✅ Configuration saved to {config_path}")
-        click.echo(f"   Total boards: {len(config.get('boards', []))}\n")
+        config = {
+            'obsidian_root': None,
+            'default_assets_folder': '.local_assets/Trello',
+            'boards': [],
+        }
+        
+        # Fetch details for all boards
+        boards = []
+        for i, board in enumerate(sorted(all_boards, key=lambda b: b.get('name', '')), 1):
+            board_id = board['id']
+            board_name = board.get('name', 'Unknown')
+            
+            click.echo(f"[{i}/{len(all_boards)}] Fetching details for: {board_name}")
+            board_details = sync_client.get_board(board_id)
+            
+            org = board_details.get('organization', {})
+            org_name = org.get('displayName', '') if org else ''
+            
+            boards.append({
+                'board_id': board_id,
+                'board_name': board_name,
+                'enabled': False,
+                'target_path': '20_tasks/Trello/{org}/{board}/{column}/{card}.md',
+                'org': org_name,
+                'workspace_name': org_name,  # For backward compatibility
+            })
         
+        config['boards'] = boards
+        click.echo()
+    
+    # Write config file with proper formatting
+    config_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Prepare YAML content with comments, collected as chunks and joined once
+    out: list[str] = []
+    append = out.append
+    append("# Trello Sync Configuration\n")
+    append("# Copy this file to trello-sync.yaml and configure your boards\n\n")
+    append("# Global settings\n")
+    
+    # Write global settings
+    if config.get('obsidian_root'):
+        append(f"obsidian_root: {config['obsidian_root']}\n")
+    else:
+        append("obsidian_root: null  # Optional, defaults to OBSIDIAN_ROOT env var\n")
+    
+    append(f"default_assets_folder: {config.get('default_assets_folder', '.local_assets/Trello')}\n\n")
+    
+    # Write board mappings with comments
+    append("# Board mappings\n")
+    append("# Available settings for each board:\n")
+    append("#   board_id: (required) Trello board ID\n")
+    append("#   board_name: (optional) Board name for reference\n")
+    append("#   org: (optional) Organization/workspace name for reference\n")
+    append("#   enabled: (required) true/false to enable/disable syncing\n")
+    append("#   target_path: (required) Path template for card files\n")
+    append("#   assets_folder: (optional) Override default assets folder\n")
+    append("#   workspace_name: (optional) Workspace name for {org} substitution (deprecated, use 'org')\n")
+    append("#\n")
+    append("# Path template variables:\n")
+    append("#   {org}   - Workspace/organization name (sanitized)\n")
+    append("#   {board} - Board name (sanitized)\n")
+    append("#   {column} - List/column name (sanitized)\n")
+    append("#   {card}  - Card name (sanitized, without .md extension)\n")
+    append("boards:\n")
+    
+    # Write each board with proper indentation
+    for board in config.get('boards', []):
+        append(f"  - board_id: \"{board['board_id']}\"\n")
+        if board.get('board_name'):
+            append(f"    board_name: \"{board['board_name']}\"\n")
+        # Always include org field (even if empty) for consistency
+        org_value = board.get('org', '')
+        append(f"    org: \"{org_value}\"\n")
+        append(f"    enabled: {str(board.get('enabled', False)).lower()}\n")
+        append(f"    target_path: \"{board.get('target_path', '20_tasks/Trello/{org}/{board}/{column}/{card}.md')}\"\n")
+        if board.get('workspace_name'):
+            append(f"    workspace_name: \"{board['workspace_name']}\"\n")
+        if board.get('assets_folder'):
+            append(f"    assets_folder: \"{board['assets_folder']}\"\n")
+        append("\n")
+    
+    # Write to file in a single call
+    with open(config_path, 'w', encoding='utf-8') as f:
+        f.write(''.join(out))
+    
+    click.echo(f"✅ Configuration saved to {config_path}")
+    click.echo(f"   Total boards: {len(config.get('boards', []))}\n")
+    
+    return config_path
+
+
+@cli.command()
+@click.option('--force', is_flag=True, help='Overwrite existing configuration (use with caution)')
+def config_init(force: bool) -> None:
+    """Initialize or update trello-sync.yaml with all accessible boards.
+    
+    This command:
+    - Fetches all boards accessible to your Trello account
+    - If config file exists: adds missing boards, removes deleted boards, preserves existing settings
+    - If config file doesn't exist: creates it with all boards (enabled: false by default)
+    
+    Existing board configurations (enabled, target_path, etc.) are preserved.
+    """
+    try:
+        config_init_impl(force)
     except ValueError as e:
         raise click.ClickException(str(e))
     except Exception as e:
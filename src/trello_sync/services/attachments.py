@@ -236,6 +236,7 @@ def get_asset_path(
     card_path: Path,
     attachment_name: str,
     assets_folder: Path,
+    created_dirs: set[str] | None = None,
 ) -> Path:
     """Calculate the path for an attachment asset.
 
@@ -243,6 +244,8 @@ def get_asset_path(
         card_path: Path to the card markdown file.
         attachment_name: Name of the attachment file.
         assets_folder: Base assets folder path.
+        created_dirs: Optional set of directory path strings already created; the assets
+            folder is only created if missing from it, and is added once created.
 
     Returns:
         Path where the attachment should be stored.
@@ -251,7 +254,11 @@ def get_asset_path(
     sanitized_name = sanitize_filename(attachment_name)
     
     # Ensure assets folder exists
-    assets_folder.mkdir(parents=True, exist_ok=True)
+    assets_dir = os.fspath(assets_folder)
+    if created_dirs is None or assets_dir not in created_dirs:
+        os.makedirs(assets_dir, exist_ok=True)
+        if created_dirs is not None:
+            created_dirs.add(assets_dir)
     
     # Return path in assets folder
     return assets_folder / sanitized_name
@@ -1,11 +1,22 @@
 """Trello API service for syncing boards to local markdown files."""
 
+import json
 import os
-from datetime import datetime
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
+from urllib.parse import urlencode
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = None
 
 from trello_sync.services.attachments import (
     download_attachment,
@@ -16,15 +27,119 @@ from trello_sync.services.attachments import (
 )
 from trello_sync.utils.config import (
     ConfigError,
+    compile_path_template,
     get_board_config,
     get_obsidian_root,
     load_config,
     resolve_path_template,
 )
-from trello_sync.utils.formatting import sanitize_file_name
+from trello_sync.utils.formatting import parse_iso_timestamp, sanitize_file_name
 from trello_sync.utils.markdown import generate_markdown
 
 TRELLO_BASE_URL = 'https://api.trello.com/1'
+# Directory under the Obsidian root holding one ETag cache file per board
+ETAG_CACHE_DIRNAME = '.trello-sync-etags'
+# (connect, read) timeout in seconds for Trello API requests
+REQUEST_TIMEOUT = (5, 30)
+# Maximum number of Trello API requests in flight at once
+MAX_CONCURRENT_REQUESTS = 10
+# Threads comparing and writing rendered card files
+MAX_WRITE_WORKERS = 4
+# Retry policy for idempotent requests that hit rate limits or server errors
+REQUEST_RETRIES = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=('GET',),
+    # Hand the last response back so callers still see requests.HTTPError
+    raise_on_status=False,
+)
+# Card fields needed from list listings; full details are fetched per card
+CARD_LIST_FIELDS = 'id,name,dateLastActivity,idList'
+# Card fields read by generate_markdown
+CARD_FIELDS = (
+    'name,desc,url,shortUrl,idShort,dateLastActivity,due,dueComplete,start,'
+    'closed,subscribed,pos,labels,cover'
+)
+ATTACHMENT_FIELDS = 'id,name,url,isUpload,mimeType,bytes,date'
+LIST_FIELDS = 'name,closed,pos'
+# Returned instead of cached data when a conditional GET is answered with 304
+NOT_MODIFIED = object()
+
+
+def _write_file_atomic(path: str | Path, data: bytes) -> None:
+    """Write data to a file atomically via a temporary file and rename.
+
+    Args:
+        path: Destination file path.
+        data: Bytes to write.
+    """
+    # Per-thread temp name so concurrent writers never share a temp file
+    tmp_path = f'{os.fspath(path)}.{threading.get_ident()}.tmp'
+    try:
+        # Write straight to the descriptor, bypassing Python's buffered file layer
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _store_card_file(card_path: str, data: bytes, created_dirs: set[str]) -> bool:
+    """Write a rendered card file unless its content is unchanged.
+
+    Args:
+        card_path: Destination card file path.
+        data: Encoded markdown content.
+        created_dirs: Directories already created during this sync.
+
+    Returns:
+        True if the file was written, False if only its mtime was refreshed.
+    """
+    try:
+        with open(card_path, 'rb') as f:
+            unchanged = f.read() == data
+    except FileNotFoundError:
+        unchanged = False
+    
+    if unchanged:
+        # Only refresh mtime so the card isn't re-fetched next sync
+        os.utime(card_path)
+        return False
+    
+    # Create directory and write file
+    card_dir = os.path.dirname(card_path)
+    if card_dir not in created_dirs:
+        os.makedirs(card_dir, exist_ok=True)
+        created_dirs.add(card_dir)
+    _write_file_atomic(card_path, data)
+    return True
+
+
+def _scan_file_mtimes(directory: str) -> dict[str, float]:
+    """List the modification times of all files in a directory.
+
+    Args:
+        directory: Directory to scan.
+
+    Returns:
+        Dictionary mapping file names to modification times, empty if the
+        directory does not exist.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name: entry.stat().st_mtime for entry in entries if entry.is_file()}
+    except FileNotFoundError:
+        return {}
 
 
 def get_credentials() -> tuple[str, str]:
@@ -48,19 +163,59 @@ def get_credentials() -> tuple[str, str]:
 class TrelloSync:
     """Main sync class for Trello operations."""
 
-    def __init__(self) -> None:
-        """Initialize TrelloSync with credentials and session."""
+    __slots__ = (
+        'api_key',
+        'token',
+        'base_url',
+        'session',
+        '_auth_params',
+        'conditional',
+        '_etag_cache',
+        '_etag_seen',
+        '_boards',
+    )
+
+    def __init__(self, conditional: bool = False) -> None:
+        """Initialize TrelloSync with credentials and session.
+
+        Args:
+            conditional: If True, send conditional GETs (If-None-Match) and reuse
+                cached responses when Trello answers 304 Not Modified.
+        """
         self.api_key, self.token = get_credentials()
         self.base_url = TRELLO_BASE_URL
         self.session = requests.Session()
-
-    def _request(self, method: str, endpoint: str, params: dict[str, Any] | None = None) -> Any:
+        # Keep one pooled connection per concurrent request so workers reuse them
+        adapter = HTTPAdapter(
+            pool_maxsize=MAX_CONCURRENT_REQUESTS, max_retries=REQUEST_RETRIES
+        )
+        self.session.mount('https://', adapter)
+        # Added per API request, not as session.params: the session is also used
+        # for attachment downloads, where auth must not reach third-party hosts
+        self._auth_params = {'key': self.api_key, 'token': self.token}
+        self.conditional = conditional
+        # Board details by board ID, fetched at most once per instance
+        self._boards: dict[str, dict[str, Any]] = {}
+        # Maps request key -> {'etag': ...[, 'data': ...]} for conditional GETs
+        self._etag_cache: dict[str, dict[str, Any]] = {}
+        # Request keys requested since the cache was loaded; only these are saved
+        self._etag_seen: set[str] = set()
+
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        use_cached: bool = True,
+    ) -> Any:
         """Make API request to Trello.
 
         Args:
             method: HTTP method (GET, POST, etc.).
             endpoint: API endpoint path.
             params: Optional query parameters.
+            use_cached: If False, return NOT_MODIFIED instead of the cached
+                response when a conditional GET is answered with 304.
 
         Returns:
             JSON response from the API.
@@ -69,16 +224,81 @@ class TrelloSync:
             requests.HTTPError: If the request fails.
         """
         url = f"{self.base_url}/{endpoint}"
-        auth_params: dict[str, Any] = {
-            'key': self.api_key,
-            'token': self.token
-        }
-        if params:
-            auth_params.update(params)
+        cache_key = None
+        cached = None
+        headers = None
+        if self.conditional and method == 'GET':
+            cache_key = f"{endpoint}?{urlencode(sorted(params.items()))}" if params else endpoint
+            cached = self._etag_cache.get(cache_key)
+            if cached is not None and use_cached and 'data' not in cached:
+                # Only the ETag was kept, but this caller needs the body
+                cached = None
+            if cached:
+                headers = {'If-None-Match': cached['etag']}
         
-        response = self.session.request(method, url, params=auth_params)
+        request_params = {**self._auth_params, **params} if params else self._auth_params
+        response = self.session.request(
+            method, url, params=request_params, headers=headers, timeout=REQUEST_TIMEOUT
+        )
+        if cached and response.status_code == 304:
+            self._etag_seen.add(cache_key)
+            return cached['data'] if use_cached else NOT_MODIFIED
         response.raise_for_status()
-        return response.json()
+        if _json_loads is not None:
+            content = response.content
+            data = _json_loads(content) if content else None
+        else:
+            data = response.json()
+        
+        if cache_key is not None:
+            etag = response.headers.get('ETag')
+            if etag:
+                # Callers that don't reuse the body on 304 only need the ETag
+                if use_cached:
+                    self._etag_cache[cache_key] = {'etag': etag, 'data': data}
+                else:
+                    self._etag_cache[cache_key] = {'etag': etag}
+                self._etag_seen.add(cache_key)
+        return data
+
+    def load_etag_cache(self, cache_path: Path) -> None:
+        """Replace the in-memory ETag cache with the entries stored on disk.
+
+        Entries that are not a dict with a string 'etag' are skipped, so a
+        hand-edited or truncated file cannot break a later request.
+
+        Args:
+            cache_path: Path to the ETag cache JSON file.
+        """
+        self._etag_cache = {}
+        self._etag_seen = set()
+        try:
+            cache = json.loads(cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return
+        if not isinstance(cache, dict):
+            return
+        for cache_key, entry in cache.items():
+            if not isinstance(entry, dict) or not isinstance(entry.get('etag'), str):
+                continue
+            loaded = {'etag': entry['etag']}
+            if 'data' in entry:
+                loaded['data'] = entry['data']
+            self._etag_cache[cache_key] = loaded
+
+    def save_etag_cache(self, cache_path: Path) -> None:
+        """Persist the ETag cache entries used since it was loaded.
+
+        Entries not requested since load_etag_cache, such as deleted cards,
+        are dropped.
+
+        Args:
+            cache_path: Path to the ETag cache JSON file.
+        """
+        etag_cache = self._etag_cache
+        entries = {key: etag_cache[key] for key in self._etag_seen if key in etag_cache}
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_file_atomic(cache_path, json.dumps(entries).encode('utf-8'))
 
     def get_boards(self) -> list[dict[str, Any]]:
         """Get all boards accessible to the authenticated user.
@@ -91,13 +311,20 @@ class TrelloSync:
     def get_board(self, board_id: str) -> dict[str, Any]:
         """Get board details.
 
+        Results are cached per instance, so repeated lookups of the same board
+        (e.g. one per watched card) only hit the API once.
+
         Args:
             board_id: The ID of the board to retrieve.
 
         Returns:
             Board dictionary with details.
         """
-        board = self._request('GET', f'boards/{board_id}')
+        if board_id in self._boards:
+            return self._boards[board_id]
+        
+        # Copy so the organization isn't added to the cached conditional response
+        board = dict(self._request('GET', f'boards/{board_id}'))
         
         # If board has idOrganization, fetch organization details
         if board.get('idOrganization'):
@@ -109,6 +336,7 @@ class TrelloSync:
                 # If we can't fetch org, just continue without it
                 pass
         
+        self._boards[board_id] = board
         return board
 
     def get_board_lists(self, board_id: str) -> list[dict[str, Any]]:
@@ -120,7 +348,9 @@ class TrelloSync:
         Returns:
             List of list dictionaries.
         """
-        return self._request('GET', f'boards/{board_id}/lists', {'filter': 'all'})
+        return self._request(
+            'GET', f'boards/{board_id}/lists', {'filter': 'all', 'fields': LIST_FIELDS}
+        )
 
     def get_cards_in_list(self, list_id: str) -> list[dict[str, Any]]:
         """Get all cards in a list.
@@ -129,29 +359,37 @@ class TrelloSync:
             list_id: The ID of the list.
 
         Returns:
-            List of card dictionaries.
+            List of card dictionaries with the fields needed to decide whether
+            a card must be synced.
         """
-        return self._request('GET', f'lists/{list_id}/cards')
+        return self._request('GET', f'lists/{list_id}/cards', {'fields': CARD_LIST_FIELDS})
 
-    def get_card(self, card_id: str) -> dict[str, Any]:
+    def get_card(self, card_id: str, use_cached: bool = True) -> dict[str, Any]:
         """Get full card details.
 
+        Comments, attachments, members and checklists are expanded inline, so a
+        single request returns everything needed to render the card.
+
         Args:
             card_id: The ID of the card to retrieve.
+            use_cached: If False, return NOT_MODIFIED when a conditional
+                request reports the card unchanged.
 
         Returns:
             Card dictionary with all details.
         """
         params = {
-            'fields': 'all',
+            'fields': CARD_FIELDS,
             'members': 'true',
             'member_fields': 'fullName,username,id,initials',
             'checklists': 'all',
             'checklist_fields': 'all',
             'attachments': 'true',
-            'actions': 'commentCard'
+            'attachment_fields': ATTACHMENT_FIELDS,
+            'actions': 'commentCard',
+            'actions_limit': 1000,
         }
-        return self._request('GET', f'cards/{card_id}', params)
+        return self._request('GET', f'cards/{card_id}', params, use_cached=use_cached)
 
     def get_card_comments(self, card_id: str) -> list[dict[str, Any]]:
         """Get comments for a card.
@@ -239,6 +477,30 @@ class TrelloSync:
         
         return watched_cards
 
+    def _get_full_card(self, card_id: str, use_cached: bool = True) -> dict[str, Any]:
+        """Get full card details in the shape expected by generate_markdown.
+
+        Args:
+            card_id: The ID of the card to retrieve.
+            use_cached: If False, return NOT_MODIFIED when a conditional
+                request reports the card unchanged.
+
+        Returns:
+            Card dictionary with actions, attachments, labels, members and checklists.
+        """
+        full_card = self.get_card(card_id, use_cached)
+        if full_card is NOT_MODIFIED:
+            return full_card
+        
+        # Shallow copy: the response may be the object held in the ETag cache
+        full_card = dict(full_card)
+        # Nested resources are omitted from the response when empty
+        for key in ('actions', 'attachments', 'labels', 'members', 'checklists'):
+            full_card.setdefault(key, [])
+        # Also store comments for compatibility
+        full_card['comments'] = full_card['actions']
+        return full_card
+
     def should_sync_card(self, card_path: Path, card_updated: str | None) -> bool:
         """Check if card should be synced based on file modification time.
 
@@ -249,24 +511,53 @@ class TrelloSync:
         Returns:
             True if card should be synced, False otherwise.
         """
-        if not card_path.exists():
+        try:
+            file_mtime = os.stat(card_path).st_mtime
+        except FileNotFoundError:
             return True
         
-        file_mtime = datetime.fromtimestamp(card_path.stat().st_mtime)
+        return self._is_card_newer(card_updated, file_mtime)
+
+    @staticmethod
+    def _is_card_newer(card_updated: str | None, file_mtime: float | None) -> bool:
+        """Check if a card was updated after its local file was written.
+
+        Args:
+            card_updated: ISO format date string of last card update.
+            file_mtime: Modification time of the local card file, or None if
+                the file does not exist.
+
+        Returns:
+            True if card should be synced, False otherwise.
+        """
+        if file_mtime is None:
+            return True
         
-        # Parse card updated time
-        if isinstance(card_updated, str):
-            try:
-                card_updated_dt = datetime.fromisoformat(card_updated.replace('Z', '+00:00'))
-                # Remove timezone for comparison
-                card_updated_dt = card_updated_dt.replace(tzinfo=None)
-            except (ValueError, AttributeError):
-                return True  # If we can't parse, sync it
-        else:
+        if not isinstance(card_updated, str):
             return True
         
+        try:
+            card_updated_ts = parse_iso_timestamp(card_updated)
+        except ValueError:
+            return True  # If we can't parse, sync it
+        
         # Sync if card is newer than file
-        return card_updated_dt > file_mtime
+        return card_updated_ts > file_mtime
+
+    @staticmethod
+    def is_board_enabled(board_id: str) -> bool:
+        """Check if a board is configured and enabled for syncing.
+
+        Only reads the local configuration, so callers can skip boards before
+        creating a TrelloSync session.
+
+        Args:
+            board_id: The ID of the board to check.
+
+        Returns:
+            True if the board is configured and not disabled, False otherwise.
+        """
+        return get_board_config(board_id, include_disabled=False) is not None
 
     def sync_board(
         self,
@@ -289,54 +580,64 @@ class TrelloSync:
         Raises:
             ConfigError: If board is not configured and configuration is required.
         """
+        # Load the configuration once for every lookup below
+        config = load_config()
+        
         # Check if board is configured
-        board_config = get_board_config(board_id)
+        board_config = get_board_config(board_id, config, include_disabled=False)
         
         if not board_config:
-            # Board not configured - skip it
+            # Board not configured or disabled - skip it
             return {
                 'total_cards': 0,
                 'synced_cards': 0,
                 'skipped_cards': 0,
             }
         
-        if not board_config.get('enabled', True):
-            # Board is disabled - skip it
-            return {
-                'total_cards': 0,
-                'synced_cards': 0,
-                'skipped_cards': 0,
-            }
-        
-        # Get board and workspace info
-        if not board_name:
-            board_data = self.get_board(board_id)
-            board_name = board_data['name']
-        
+        # Use config workspace_name if provided
         if not workspace_name:
-            board_data = self.get_board(board_id)
-            workspace_name = board_data.get('organization', {}).get('displayName', '')
-            # Use config workspace_name if provided
-            if board_config.get('workspace_name'):
-                workspace_name = board_config['workspace_name']
+            workspace_name = board_config.get('workspace_name')
         
         # Get Obsidian root and resolve paths
         try:
-            obsidian_root = get_obsidian_root()
+            obsidian_root = get_obsidian_root(config)
         except ConfigError:
             raise ConfigError(
                 f"Board {board_id} is configured but OBSIDIAN_ROOT is not set. "
                 "Set it as an environment variable or in trello-sync.yaml"
             )
         
+        # Loaded before any request so the board fetch below is conditional too
+        etag_cache_path = obsidian_root / ETAG_CACHE_DIRNAME / f'{board_id}.json'
+        if self.conditional:
+            self.load_etag_cache(etag_cache_path)
+        
+        # Get board and workspace info (one fetch covers both)
+        if not board_name or not workspace_name:
+            board_data = self.get_board(board_id)
+            board_name = board_name or board_data['name']
+            organization = board_data.get('organization') or {}
+            workspace_name = workspace_name or organization.get('displayName', '')
+        
         # Get target path template
         target_path_template = board_config.get('target_path', '20_tasks/Trello/{org}/{board}/{column}/{card}.md')
+        render_card_path = compile_path_template(target_path_template)
         
         # Get assets folder template
         assets_template = board_config.get('assets_folder')
         if not assets_template:
-            global_config = load_config()
-            assets_template = global_config.get('default_assets_folder', '.local_assets/Trello')
+            assets_template = config.get('default_assets_folder', '.local_assets/Trello')
+        
+        # Resolve per-board path components once, outside the card loop
+        org_dir_name = sanitize_file_name(workspace_name or 'unknown')
+        board_dir_name = sanitize_file_name(board_name)
+        assets_vars = {
+            'org': org_dir_name,
+            'board': board_dir_name,
+        }
+        assets_folder = obsidian_root / resolve_path_template(assets_template, assets_vars)
+        # Card paths stay plain strings until a card is actually written
+        obsidian_root_str = os.fspath(obsidian_root)
         
         # Get lists
         lists = self.get_board_lists(board_id)
@@ -344,133 +645,156 @@ class TrelloSync:
         total_cards = 0
         synced_cards = 0
         skipped_cards = 0
+        # Directories already created during this sync
+        created_dirs: set[str] = set()
+        # File modification times per card directory, scanned once each
+        dir_mtimes: dict[str, dict[str, float]] = {}
+        api_key = self.api_key
+        token = self.token
+        session = self.session
         
-        for list_data in lists:
-            list_name = list_data['name']
-            list_id = list_data['id']
-            
-            # Get cards in list
-            cards = self.get_cards_in_list(list_id)
+        with (
+            ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor,
+            ThreadPoolExecutor(max_workers=MAX_WRITE_WORKERS) as writer,
+        ):
+            # Fetch the cards of every list concurrently; map() keeps list order
+            list_cards = executor.map(
+                self.get_cards_in_list, [list_data['id'] for list_data in lists]
+            )
             
-            for card in cards:
-                total_cards += 1
-                card_id = card['id']
-                card_name = card['name']
-                card_updated = card.get('dateLastActivity')
+            # Decide which cards need syncing across all lists before requesting any details
+            cards_to_sync: list[tuple[dict[str, Any], str, str]] = []
+            for list_data, cards in zip(lists, list_cards):
+                column_dir_name = sanitize_file_name(list_data['name'])
                 
-                # Resolve path template
-                path_vars = {
-                    'org': sanitize_file_name(workspace_name or 'unknown'),
-                    'board': sanitize_file_name(board_name),
-                    'column': sanitize_file_name(list_name),
-                    'card': sanitize_file_name(card_name),
-                }
-                
-                resolved_path = resolve_path_template(target_path_template, path_vars)
-                card_path = obsidian_root / resolved_path
-                
-                # Check if we should sync
-                if not self.should_sync_card(card_path, card_updated):
-                    skipped_cards += 1
-                    continue
-                
-                if dry_run:
-                    synced_cards += 1
-                    continue
-                
-                # Get full card details
-                try:
-                    full_card = self.get_card(card_id)
-                    
-                    # Get additional data
-                    comments = self.get_card_comments(card_id)
-                    attachments = self.get_card_attachments(card_id)
-                    labels = self.get_card_labels(card_id)
-                    members = self.get_card_members(card_id)
-                    checklists = self.get_card_checklists(card_id)
-                    
-                    # Merge data - store as actions for comment processing
-                    full_card['actions'] = comments  # Comments come as actions
-                    full_card['attachments'] = attachments
-                    full_card['labels'] = labels
-                    full_card['members'] = members
-                    full_card['checklists'] = checklists
-                    # Also store as comments for compatibility
-                    full_card['comments'] = comments
+                for card in cards:
+                    total_cards += 1
+                    card_name = card['name']
+                    card_updated = card.get('dateLastActivity')
                     
-                    # Download attachments and prepare asset paths
-                    downloaded_attachments: dict[str, dict[str, Any]] = {}
-                    
-                    # Resolve assets folder path
-                    assets_vars = {
-                        'org': sanitize_file_name(workspace_name or 'unknown'),
-                        'board': sanitize_file_name(board_name),
+                    # Resolve path template
+                    path_vars = {
+                        'org': org_dir_name,
+                        'board': board_dir_name,
+                        'column': column_dir_name,
+                        'card': sanitize_file_name(card_name),
                     }
-                    resolved_assets_template = resolve_path_template(assets_template, assets_vars)
-                    assets_folder = obsidian_root / resolved_assets_template
                     
-                    for attachment in attachments:
-                        # Only download file attachments (not links)
-                        if attachment.get('isUpload', False):
-                            attachment_name = attachment.get('name', 'untitled')
-                            attachment_url = attachment.get('url', '')
-                            
-                            if attachment_url:
-                                try:
-                                    # Calculate asset path
-                                    asset_path = get_asset_path(card_path, attachment_name, assets_folder)
-                                    asset_path = get_unique_filename(assets_folder, asset_path.name)
-                                    
-                                    # Download attachment
-                                    download_attachment(
-                                        attachment,
-                                        asset_path,
-                                        self.api_key,
-                                        self.token,
-                                        card_id=card_id,
-                                        session=self.session,
-                                    )
-                                    
-                                    # Get relative path for markdown
-                                    relative_path = get_relative_asset_path(card_path, asset_path)
-                                    
-                                    # Store info for markdown generation
-                                    downloaded_attachments[attachment.get('id', '')] = {
-                                        'local_path': relative_path,
-                                        'is_image': is_image_file(attachment_name, attachment.get('mimeType')),
-                                        'original_url': attachment_url,
-                                        'name': attachment_name,
-                                    }
-                                except Exception as e:
-                                    # Log warning but continue
-                                    error_msg = str(e)
-                                    if "401" in error_msg or "Unauthorized" in error_msg:
-                                        print(
-                                            f"Warning: Failed to download attachment {attachment_name}: "
-                                            f"Authentication failed. Check that your Trello API token is valid and has access to this board."
-                                        )
-                                    else:
-                                        print(f"Warning: Failed to download attachment {attachment_name}: {e}")
+                    resolved_path = render_card_path(path_vars)
+                    card_path = os.path.join(obsidian_root_str, resolved_path)
                     
-                    # Generate markdown with attachment info
-                    markdown_content = generate_markdown(
-                        full_card,
-                        list_name,
-                        board_name,
-                        workspace_name,
-                        list_id=list_id,
-                        board_id=board_id,
-                        downloaded_attachments=downloaded_attachments,
-                    )
+                    # Check if we should sync
+                    card_dir, card_file = os.path.split(card_path)
+                    mtimes = dir_mtimes.get(card_dir)
+                    if mtimes is None:
+                        mtimes = dir_mtimes[card_dir] = _scan_file_mtimes(card_dir)
+                    if not self._is_card_newer(card_updated, mtimes.get(card_file)):
+                        skipped_cards += 1
+                        continue
                     
-                    # Create directory and write file
-                    card_path.parent.mkdir(parents=True, exist_ok=True)
-                    card_path.write_text(markdown_content, encoding='utf-8')
+                    cards_to_sync.append((list_data, card['id'], card_path))
+            
+            if dry_run:
+                return {
+                    'total_cards': total_cards,
+                    'synced_cards': len(cards_to_sync),
+                    'skipped_cards': skipped_cards,
+                }
+            
+            # Fetch full card details concurrently; map() keeps card order.
+            # Unchanged cards come back as NOT_MODIFIED when conditional.
+            card_ids = [card_id for _, card_id, _ in cards_to_sync]
+            full_cards = executor.map(
+                self._get_full_card, card_ids, [False] * len(card_ids)
+            )
+            
+            write_futures: list[Future[bool]] = []
+            for (list_data, card_id, card_path), full_card in zip(cards_to_sync, full_cards):
+                if full_card is NOT_MODIFIED:
+                    try:
+                        # Card unchanged on Trello; refresh mtime so it isn't re-fetched
+                        os.utime(card_path)
+                    except FileNotFoundError:
+                        # Local file was deleted; only the ETag is cached, so re-fetch it
+                        full_card = self._get_full_card(card_id)
+                    else:
+                        skipped_cards += 1
+                        continue
+                
+                attachments = full_card['attachments']
+                
+                # Download attachments and prepare asset paths
+                downloaded_attachments: dict[str, dict[str, Any]] = {}
+                
+                for attachment in attachments:
+                    # Only download file attachments (not links)
+                    if attachment.get('isUpload', False):
+                        attachment_name = attachment.get('name', 'untitled')
+                        attachment_url = attachment.get('url', '')
+                        
+                        if attachment_url:
+                            try:
+                                # Calculate asset path
+                                asset_path = get_asset_path(
+                                    Path(card_path), attachment_name, assets_folder, created_dirs
+                                )
+                                asset_path = get_unique_filename(assets_folder, asset_path.name)
+                                
+                                # Download attachment
+                                download_attachment(
+                                    attachment,
+                                    asset_path,
+                                    api_key,
+                                    token,
+                                    card_id=card_id,
+                                    session=session,
+                                )
+                                
+                                # Get relative path for markdown
+                                relative_path = get_relative_asset_path(Path(card_path), asset_path)
+                                
+                                # Store info for markdown generation
+                                downloaded_attachments[attachment.get('id', '')] = {
+                                    'local_path': relative_path,
+                                    'is_image': is_image_file(attachment_name, attachment.get('mimeType')),
+                                    'original_url': attachment_url,
+                                    'name': attachment_name,
+                                }
+                            except Exception as e:
+                                # Log warning but continue
+                                error_msg = str(e)
+                                if "401" in error_msg or "Unauthorized" in error_msg:
+                                    print(
+                                        f"Warning: Failed to download attachment {attachment_name}: "
+                                        f"Authentication failed. Check that your Trello API token is valid and has access to this board."
+                                    )
+                                else:
+                                    print(f"Warning: Failed to download attachment {attachment_name}: {e}")
+                
+                # Generate markdown with attachment info
+                markdown_content = generate_markdown(
+                    full_card,
+                    list_data['name'],
+                    board_name,
+                    workspace_name,
+                    list_id=list_data['id'],
+                    board_id=board_id,
+                    downloaded_attachments=downloaded_attachments,
+                )
+                
+                # Hand the file I/O to the writer pool and move on to the next card
+                write_futures.append(writer.submit(
+                    _store_card_file, card_path, markdown_content.encode('utf-8'), created_dirs
+                ))
+            
+            for future in write_futures:
+                if future.result():
                     synced_cards += 1
-                    
-                except Exception:
-                    # Error handling is done at CLI level
-                    raise
+                else:
+                    skipped_cards += 1
+        
+        if self.conditional:
+            self.save_etag_cache(etag_cache_path)
         
         return {
             'total_cards': total_cards,
@@ -478,6 +802,44 @@ class TrelloSync:
             'skipped_cards': skipped_cards,
         }
 
+    def _get_watching_board_paths(
+        self, board_id: str, config: dict[str, Any]
+    ) -> tuple[dict[str, str], str, Callable[[dict[str, str]], str]] | None:
+        """Collect what generate_watching_file needs to locate a board's card files.
+
+        Args:
+            board_id: The Trello board ID.
+            config: Loaded configuration.
+
+        Returns:
+            Tuple of (list names by list ID, sanitized workspace name, compiled
+            target path template), or None if the board is not configured.
+        """
+        board_config = get_board_config(board_id, config)
+        if not board_config:
+            return None
+        
+        try:
+            list_names = {l['id']: l['name'] for l in self.get_board_lists(board_id)}
+        except Exception:
+            list_names = {}
+        
+        # Get workspace name
+        workspace_name = board_config.get('workspace_name', '')
+        if not workspace_name:
+            try:
+                board_data = self.get_board(board_id)
+                workspace_name = board_data.get('organization', {}).get('displayName', '')
+            except Exception:
+                pass
+        
+        target_path_template = board_config.get('target_path', '20_tasks/Trello/{org}/{board}/{column}/{card}.md')
+        return (
+            list_names,
+            sanitize_file_name(workspace_name or 'unknown'),
+            compile_path_template(target_path_template),
+        )
+    
     def generate_watching_file(self, output_path: Path | None = None) -> tuple[Path, int]:
         """Generate a watching.md file listing all cards the user is watching.
 
@@ -512,9 +874,11 @@ class TrelloSync:
             output_path = Path(output_path)
             project_root = output_path.parent
         
+        config = load_config()
+        
         # Get Obsidian root for resolving local file paths
         try:
-            obsidian_root = get_obsidian_root()
+            obsidian_root = get_obsidian_root(config)
         except ConfigError:
             obsidian_root = None
         
@@ -528,6 +892,12 @@ class TrelloSync:
             lines.append('| Card | Board | Short Link | Last Updated |')
             lines.append('|------|-------|------------|--------------|')
             
+            # Per-board list names, workspace and path template, looked up
+            # once per board instead of once per watched card
+            board_paths: dict[
+                str, tuple[dict[str, str], str, Callable[[dict[str, str]], str]] | None
+            ] = {}
+            
             for card in watched_cards:
                 card_name = card.get('name', 'Untitled')
                 board_name = card.get('_board_name', 'Unknown Board')
@@ -539,41 +909,23 @@ class TrelloSync:
                 local_link = None
                 if obsidian_root:
                     board_id = card.get('_board_id', '')
-                    board_config = get_board_config(board_id)
+                    if board_id not in board_paths:
+                        board_paths[board_id] = self._get_watching_board_paths(board_id, config)
+                    board_path_info = board_paths[board_id]
                     
-                    if board_config:
-                        # Get list name from card
+                    if board_path_info is not None:
+                        list_names, org_dir_name, render_card_path = board_path_info
                         list_id = card.get('idList', '')
-                        if list_id:
-                            try:
-                                lists = self.get_board_lists(board_id)
-                                list_data = next((l for l in lists if l['id'] == list_id), None)
-                                list_name = list_data['name'] if list_data else 'Unknown'
-                            except Exception:
-                                list_name = 'Unknown'
-                        else:
-                            list_name = 'Unknown'
-                        
-                        # Get workspace name
-                        workspace_name = board_config.get('workspace_name', '')
-                        if not workspace_name:
-                            try:
-                                board_data = self.get_board(board_id)
-                                workspace_name = board_data.get('organization', {}).get('displayName', '')
-                            except Exception:
-                                pass
+                        list_name = list_names.get(list_id, 'Unknown') if list_id else 'Unknown'
                         
                         # Resolve path template
-                        target_path_template = board_config.get('target_path', '20_tasks/Trello/{org}/{board}/{column}/{card}.md')
                         path_vars = {
-                            'org': sanitize_file_name(workspace_name or 'unknown'),
+                            'org': org_dir_name,
                             'board': sanitize_file_name(board_name),
                             'column': sanitize_file_name(list_name),
                             'card': sanitize_file_name(card_name),
                         }
-                        
-                        resolved_path = resolve_path_template(target_path_template, path_vars)
-                        card_path = obsidian_root / resolved_path
+                        card_path = obsidian_root / render_card_path(path_vars)
                         
                         # Check if file exists
                         if card_path.exists():
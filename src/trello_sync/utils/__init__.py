@@ -2,6 +2,8 @@
 
 from trello_sync.utils.config import (
     ConfigError,
+    ValidationError,
+    compile_path_template,
     get_board_config,
     get_obsidian_root,
     load_config,
@@ -18,6 +20,8 @@ from trello_sync.utils.markdown import generate_markdown
 
 __all__ = [
     'ConfigError',
+    'ValidationError',
+    'compile_path_template',
     'format_bytes',
     'format_date',
     'format_iso_date',
@@ -1,11 +1,23 @@
 """Configuration utilities for Trello sync."""
 
+import copy
 import os
+import re
+import stat
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 
 class ConfigError(Exception):
     """Raised when there's an error with configuration."""
@@ -13,43 +25,152 @@ class ConfigError(Exception):
     pass
 
 
+# Message templates for each ValidationError code
+_VALIDATION_MESSAGES = {
+    'load_error': '{detail}',
+    'invalid_type': "'{location}' must be {detail}",
+    'invalid_board': 'Board config at index {location} must be a dictionary',
+    'missing_board_field': "Board config at index {location} missing '{detail}'",
+    'invalid_board_field_type': 'Board {location} {detail} must be a string',
+    'missing_template_var': 'Board {location} target_path missing required variable: {{{detail}}}',
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ValidationError:
+    """A single problem found by validate_config.
+    
+    Attributes:
+        code: Kind of problem, e.g. 'missing_template_var'
+        location: Config key, board index or board ID the problem applies to
+        detail: Code-specific detail, e.g. the missing variable name
+    """
+
+    code: str
+    location: str = ''
+    detail: str = ''
+
+    def __str__(self) -> str:
+        return _VALIDATION_MESSAGES[self.code].format(location=self.location, detail=self.detail)
+
+
+# Matches {variable} placeholders in path templates
+_TEMPLATE_VAR_RE = re.compile(r'\{(\w+)\}')
+
+# Validation rules used by validate_config
+_CONFIG_STRING_FIELDS = ('obsidian_root', 'default_assets_folder')
+_BOARD_REQUIRED_FIELDS = ('board_id',)
+_BOARD_STRING_FIELDS = ('target_path', 'assets_folder')
+_TARGET_PATH_REQUIRED_VARS = ('org', 'board', 'column', 'card')
+
+# Boards section preamble written by save_config
+_BOARDS_HEADER = (
+    "\n# Board mappings\n"
+    "# Available settings for each board:\n"
+    "#   board_id: (required) Trello board ID\n"
+    "#   board_name: (optional) Board name for reference\n"
+    "#   org: (optional) Organization/workspace name for reference\n"
+    "#   enabled: (required) true/false to enable/disable syncing\n"
+    "#   target_path: (required) Path template for card files\n"
+    "#   assets_folder: (optional) Override default assets folder\n"
+    "#   workspace_name: (optional) Workspace name for {org} substitution\n"
+    "#\n"
+    "# Path template variables:\n"
+    "#   {org}   - Workspace/organization name (sanitized)\n"
+    "#   {board} - Board name (sanitized)\n"
+    "#   {column} - List/column name (sanitized)\n"
+    "#   {card}  - Card name (sanitized, without .md extension)\n"
+    "boards:\n"
+)
+
+# Parsed config files keyed by path, validated by (st_mtime_ns, st_size), with
+# each file's boards indexed by board_id: all boards, then only enabled ones
+_CONFIG_CACHE_SIZE = 8
+_config_cache: OrderedDict[
+    Path,
+    tuple[int, int, dict[str, Any], dict[str, dict[str, Any]], dict[str, dict[str, Any]]],
+] = OrderedDict()
+
+# Expanded Obsidian root paths keyed by the raw configured string
+_obsidian_paths: dict[str, Path] = {}
+
+# Config file paths keyed by the working directory they were resolved from
+_config_paths: dict[Path, Path] = {}
+
+
 def get_config_path() -> Path:
     """Get the path to the configuration file.
 
+    The result is cached per working directory, so repeated calls during a
+    sync don't probe the filesystem again. When no config file exists the
+    default path is cached too; it is where config commands create the file.
+
     Returns:
         Path to trello-sync.yaml in the project root.
     """
-    # Look for config in current directory or parent directories
     current = Path.cwd()
+    config_file = _config_paths.get(current)
+    if config_file is not None:
+        return config_file
+    
+    # Look for config in current directory or parent directories
     for path in [current, current.parent]:
         config_file = path / 'trello-sync.yaml'
         if config_file.exists():
-            return config_file
-    # Default to current directory
-    return current / 'trello-sync.yaml'
+            break
+    else:
+        # Default to current directory
+        config_file = current / 'trello-sync.yaml'
+    
+    _config_paths[current] = config_file
+    return config_file
 
 
-def load_config() -> dict[str, Any]:
-    """Load configuration from trello-sync.yaml.
+def clear_config_cache() -> None:
+    """Forget parsed config files, resolved config paths and Obsidian roots.
+
+    load_config already notices edits through the file's mtime and size; this
+    is for callers (mainly tests) that need a guaranteed re-read, that create
+    a config file in a parent directory after a lookup, or that change HOME
+    between calls.
+    """
+    _config_cache.clear()
+    _config_paths.clear()
+    _obsidian_paths.clear()
+
+
+def _load_cached_config() -> (
+    tuple[dict[str, Any], dict[str, dict[str, Any]], dict[str, dict[str, Any]]] | None
+):
+    """Parse trello-sync.yaml, or reuse the cached parse if the file is unchanged.
+
+    The returned objects are shared with the cache and must not be modified.
 
     Returns:
-        Configuration dictionary.
+        Tuple of (config, boards by board_id, enabled boards by board_id), or
+        None if there is no config file.
 
     Raises:
-        ConfigError: If config file is invalid or missing required fields.
+        ConfigError: If config file is invalid.
     """
     config_path = get_config_path()
     
-    if not config_path.exists():
-        return {
-            'obsidian_root': None,
-            'default_assets_folder': '.local_assets/Trello',
-            'boards': [],
-        }
+    try:
+        config_stat = os.stat(config_path)
+    except FileNotFoundError:
+        return None
+    
+    # Reuse the parsed file while its mtime and size are unchanged
+    cached = _config_cache.get(config_path)
+    if cached is not None and cached[:2] == (config_stat.st_mtime_ns, config_stat.st_size):
+        _config_cache.move_to_end(config_path)
+        return cached[2:]
     
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f) or {}
+            config = yaml.load(f, Loader=_YamlLoader) or {}
+    except FileNotFoundError:
+        return None
     except yaml.YAMLError as e:
         raise ConfigError(f"Invalid YAML in config file: {e}")
     except Exception as e:
@@ -60,19 +181,66 @@ def load_config() -> dict[str, Any]:
     config.setdefault('default_assets_folder', '.local_assets/Trello')
     config.setdefault('boards', [])
     
-    return config
+    # Index boards by ID; the first entry wins, as with a linear search
+    boards_by_id: dict[str, dict[str, Any]] = {}
+    boards = config['boards']
+    if isinstance(boards, list):
+        for board_config in boards:
+            if isinstance(board_config, dict) and 'board_id' in board_config:
+                boards_by_id.setdefault(board_config['board_id'], board_config)
+    enabled_boards_by_id = {
+        board_id: board_config
+        for board_id, board_config in boards_by_id.items()
+        if board_config.get('enabled', True)
+    }
+    
+    _config_cache[config_path] = (
+        config_stat.st_mtime_ns, config_stat.st_size, config, boards_by_id, enabled_boards_by_id
+    )
+    if len(_config_cache) > _CONFIG_CACHE_SIZE:
+        _config_cache.popitem(last=False)
+    
+    return config, boards_by_id, enabled_boards_by_id
+
+
+def load_config() -> dict[str, Any]:
+    """Load configuration from trello-sync.yaml.
+
+    The parsed file is cached until its modification time or size changes;
+    each call returns a fresh copy that callers may modify.
 
+    Returns:
+        Configuration dictionary.
 
-def get_obsidian_root() -> Path:
+    Raises:
+        ConfigError: If config file is invalid or missing required fields.
+    """
+    loaded = _load_cached_config()
+    if loaded is None:
+        return {
+            'obsidian_root': None,
+            'default_assets_folder': '.local_assets/Trello',
+            'boards': [],
+        }
+    
+    # Callers may modify the result, so never hand out the cached dict itself
+    return copy.deepcopy(loaded[0])
+
+
+def get_obsidian_root(config: dict[str, Any] | None = None) -> Path:
     """Get the Obsidian root path.
 
+    Args:
+        config: Optional already-loaded configuration; loaded if not given.
+
     Returns:
         Path to Obsidian root directory.
 
     Raises:
         ConfigError: If obsidian_root is not configured.
     """
-    config = load_config()
+    if config is None:
+        config = load_config()
     
     # Check environment variable first
     obsidian_root = os.getenv('OBSIDIAN_ROOT')
@@ -86,49 +254,122 @@ def get_obsidian_root() -> Path:
             "OBSIDIAN_ROOT not set. Set it as an environment variable or in trello-sync.yaml"
         )
     
-    obsidian_path = Path(obsidian_root).expanduser()
+    # The configured string rarely changes, so expand it once; the directory
+    # itself is still checked on every call
+    obsidian_path = _obsidian_paths.get(obsidian_root)
+    if obsidian_path is None:
+        obsidian_path = _obsidian_paths[obsidian_root] = Path(obsidian_root).expanduser()
     
-    if not obsidian_path.exists():
+    # One stat covers both the existence and the directory check
+    try:
+        mode = os.stat(obsidian_path).st_mode
+    except (FileNotFoundError, NotADirectoryError):
         raise ConfigError(f"Obsidian root path does not exist: {obsidian_path}")
     
-    if not obsidian_path.is_dir():
+    if not stat.S_ISDIR(mode):
         raise ConfigError(f"Obsidian root path is not a directory: {obsidian_path}")
     
     return obsidian_path
 
 
-def get_board_config(board_id: str) -> dict[str, Any] | None:
+def get_board_config(
+    board_id: str,
+    config: dict[str, Any] | None = None,
+    include_disabled: bool = True,
+) -> dict[str, Any] | None:
     """Get configuration for a specific board.
 
+    Without a config, the board is looked up in the cached board_id indexes
+    of the config file and only that board's settings are copied.
+
     Args:
         board_id: The Trello board ID.
+        config: Optional already-loaded configuration; loaded if not given.
+        include_disabled: If False, boards with ``enabled: false`` are
+            treated as not configured.
 
     Returns:
         Board configuration dictionary, or None if not configured.
     """
-    config = load_config()
+    if config is None:
+        loaded = _load_cached_config()
+        if loaded is None:
+            return None
+        board_config = loaded[1 if include_disabled else 2].get(board_id)
+        return copy.deepcopy(board_config) if board_config is not None else None
     
     for board_config in config.get('boards', []):
         if board_config.get('board_id') == board_id:
+            if not include_disabled and not board_config.get('enabled', True):
+                return None
             return board_config
     
     return None
 
 
-def resolve_path_template(template: str, variables: dict[str, str]) -> str:
+@lru_cache(maxsize=64)
+def compile_path_template(
+    template: str,
+    sanitize_func: Callable[[str], str] | None = None,
+) -> Callable[[dict[str, str]], str]:
+    """Compile a path template into a reusable render function.
+
+    The template is split into literal chunks and placeholder names once;
+    rendering is then a dict lookup per placeholder and a join. Compiled
+    templates are cached, so per-board target paths are only parsed once.
+
+    Args:
+        template: Path template with {variable} placeholders.
+        sanitize_func: Optional function applied to each substituted value.
+
+    Returns:
+        Function mapping a variables dict to the resolved path string.
+        Placeholders without a matching variable are left unchanged.
+    """
+    # re.split with a capture group alternates literal, name, literal, ...
+    parts = _TEMPLATE_VAR_RE.split(template)
+    head = parts[0]
+    chunks = tuple(zip(parts[1::2], parts[2::2]))
+    
+    def render(variables: dict[str, str]) -> str:
+        out = [head]
+        for name, literal in chunks:
+            if name in variables:
+                value = variables[name]
+                out.append(sanitize_func(value) if sanitize_func is not None else value)
+            else:
+                out.append(f'{{{name}}}')
+            out.append(literal)
+        return ''.join(out)
+    
+    return render
+
+
+def resolve_path_template(
+    template: str,
+    variables: dict[str, str],
+    sanitize_func: Callable[[str], str] | None = None,
+) -> str:
     """Resolve a path template with variable substitution.
 
+    Placeholders without a matching variable are left unchanged. Callers
+    resolving the same template repeatedly can use compile_path_template
+    directly.
+
     Args:
         template: Path template with {variable} placeholders.
         variables: Dictionary of variable names to values.
+        sanitize_func: Optional function applied to each substituted value,
+            e.g. sanitize_file_name for raw Trello names.
 
     Returns:
         Resolved path string.
     """
-    result = template
-    for key, value in variables.items():
-        result = result.replace(f'{{{key}}}', value)
-    return result
+    # Literal paths (e.g. a plain assets folder) need no parsing
+    if '{' not in template:
+        return template
+    
+    return compile_path_template(template, sanitize_func)(variables)
 
 
 def save_config(config: dict[str, Any]) -> None:
@@ -142,102 +383,112 @@ def save_config(config: dict[str, Any]) -> None:
     # Ensure parent directory exists
     config_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(config_path, 'w', encoding='utf-8') as f:
-        # Write header comments
-        f.write("# Trello Sync Configuration\n")
-        f.write("# Copy this file to trello-sync.yaml and configure your boards\n\n")
-        f.write("# Global settings\n")
+    # Build the whole file, then write it in one call
+    out: list[str] = []
+    
+    # Header comments
+    out.append("# Trello Sync Configuration\n")
+    out.append("# Copy this file to trello-sync.yaml and configure your boards\n\n")
+    out.append("# Global settings\n")
+    
+    # Global settings
+    if 'obsidian_root' in config and config['obsidian_root']:
+        out.append(f"obsidian_root: {config['obsidian_root']}\n")
+    if 'default_assets_folder' in config:
+        out.append(f"default_assets_folder: {config['default_assets_folder']}\n")
+    
+    out.append(_BOARDS_HEADER)
+    
+    # Board entries with proper indentation
+    boards = config.get('boards', []) or []
+    for board_config in boards:
+        out.append(f'  - board_id: "{board_config["board_id"]}"\n')
         
-        # Write global settings
-        if 'obsidian_root' in config and config['obsidian_root']:
-            f.write(f"obsidian_root: {config['obsidian_root']}\n")
-        if 'default_assets_folder' in config:
-            f.write(f"default_assets_folder: {config['default_assets_folder']}\n")
+        if 'board_name' in board_config and board_config['board_name']:
+            out.append(f'    board_name: "{board_config["board_name"]}"\n')
         
-        f.write("\n# Board mappings\n")
-        f.write("# Available settings for each board:\n")
-        f.write("#   board_id: (required) Trello board ID\n")
-        f.write("#   board_name: (optional) Board name for reference\n")
-        f.write("#   org: (optional) Organization/workspace name for reference\n")
-        f.write("#   enabled: (required) true/false to enable/disable syncing\n")
-        f.write("#   target_path: (required) Path template for card files\n")
-        f.write("#   assets_folder: (optional) Override default assets folder\n")
-        f.write("#   workspace_name: (optional) Workspace name for {org} substitution\n")
-        f.write("#\n")
-        f.write("# Path template variables:\n")
-        f.write("#   {org}   - Workspace/organization name (sanitized)\n")
-        f.write("#   {board} - Board name (sanitized)\n")
-        f.write("#   {column} - List/column name (sanitized)\n")
-        f.write("#   {card}  - Card name (sanitized, without .md extension)\n")
-        f.write("boards:\n")
+        # Always include org field, even if empty (similar to workspace_name)
+        org_value = board_config.get('org', '')
+        out.append(f'    org: "{org_value}"\n')
         
-        # Write board entries with proper indentation
-        boards = config.get('boards', []) or []
-        for board_config in boards:
-            f.write("  - board_id: ")
-            f.write(f'"{board_config["board_id"]}"\n')
-            
-            if 'board_name' in board_config and board_config['board_name']:
-                f.write(f'    board_name: "{board_config["board_name"]}"\n')
-            
-            # Always include org field, even if empty (similar to workspace_name)
-            org_value = board_config.get('org', '')
-            f.write(f'    org: "{org_value}"\n')
-            
-            f.write(f'    enabled: {str(board_config.get("enabled", False)).lower()}\n')
-            
-            if 'target_path' in board_config:
-                f.write(f'    target_path: "{board_config["target_path"]}"\n')
-            
-            if 'assets_folder' in board_config and board_config['assets_folder']:
-                f.write(f'    assets_folder: "{board_config["assets_folder"]}"\n')
-            
-            # Always include workspace_name, even if empty
-            workspace_name = board_config.get('workspace_name', '')
-            if workspace_name:
-                f.write(f'    workspace_name: "{workspace_name}"\n')
-            else:
-                f.write('    workspace_name: ""\n')
-            
-            f.write("\n")
+        out.append(f'    enabled: {str(board_config.get("enabled", False)).lower()}\n')
+        
+        if 'target_path' in board_config:
+            out.append(f'    target_path: "{board_config["target_path"]}"\n')
+        
+        if 'assets_folder' in board_config and board_config['assets_folder']:
+            out.append(f'    assets_folder: "{board_config["assets_folder"]}"\n')
+        
+        # Always include workspace_name, even if empty
+        workspace_name = board_config.get('workspace_name', '')
+        out.append(f'    workspace_name: "{workspace_name}"\n\n')
+    
+    # Write to a temp file and swap it in, so an interrupted save never leaves
+    # a truncated config behind
+    tmp_path = config_path.with_name(f'{config_path.name}.tmp')
+    try:
+        tmp_path.write_bytes(''.join(out).encode('utf-8'))
+        os.replace(tmp_path, config_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    
+    # Don't trust mtime/size alone for a file we just rewrote
+    _config_cache.pop(config_path, None)
 
 
-def validate_config() -> list[str]:
+def validate_config(config: dict[str, Any] | None = None) -> list[ValidationError]:
     """Validate configuration file.
 
+    Args:
+        config: Optional already-loaded configuration; loaded if not given.
+
     Returns:
-        List of error messages (empty if valid).
+        List of validation errors (empty if valid). Each renders as a
+        human-readable message via str().
     """
-    errors: list[str] = []
+    errors: list[ValidationError] = []
     
-    try:
-        config = load_config()
-    except ConfigError as e:
-        return [str(e)]
+    if config is None:
+        try:
+            config = load_config()
+        except ConfigError as e:
+            return [ValidationError('load_error', detail=str(e))]
+    
+    # Validate top-level settings
+    for key in _CONFIG_STRING_FIELDS:
+        value = config.get(key)
+        if value is not None and not isinstance(value, str):
+            errors.append(ValidationError('invalid_type', key, 'a string'))
     
     # Validate board configurations
     boards = config.get('boards', [])
     if not isinstance(boards, list):
-        errors.append("'boards' must be a list")
+        errors.append(ValidationError('invalid_type', 'boards', 'a list'))
         return errors
     
     for i, board_config in enumerate(boards):
         if not isinstance(board_config, dict):
-            errors.append(f"Board config at index {i} must be a dictionary")
+            errors.append(ValidationError('invalid_board', str(i)))
             continue
         
-        if 'board_id' not in board_config:
-            errors.append(f"Board config at index {i} missing 'board_id'")
+        for key in _BOARD_REQUIRED_FIELDS:
+            if key not in board_config:
+                errors.append(ValidationError('missing_board_field', str(i), key))
         
-        if 'target_path' in board_config:
-            template = board_config['target_path']
-            required_vars = ['org', 'board', 'column', 'card']
-            for var in required_vars:
-                if f'{{{var}}}' not in template:
-                    errors.append(
-                        f"Board {board_config.get('board_id', 'unknown')} target_path "
-                        f"missing required variable: {{{var}}}"
-                    )
+        board_label = str(board_config.get('board_id', 'unknown'))
+        for key in _BOARD_STRING_FIELDS:
+            value = board_config.get(key)
+            if value is not None and not isinstance(value, str):
+                errors.append(ValidationError('invalid_board_field_type', board_label, key))
+        
+        template = board_config.get('target_path')
+        if isinstance(template, str):
+            # One scan collects every placeholder used in the template
+            found_vars = set(_TEMPLATE_VAR_RE.findall(template))
+            for var in _TARGET_PATH_REQUIRED_VARS:
+                if var not in found_vars:
+                    errors.append(ValidationError('missing_template_var', board_label, var))
     
     return errors
 
@@ -1,11 +1,28 @@
 """Formatting utility functions for file names and dates."""
 
-from datetime import datetime
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
 
+try:
+    from ciso8601 import parse_datetime as _parse_datetime
+except ImportError:
+    _parse_datetime = None
 
+# Characters dropped from file names: anything but letters, digits, spaces and hyphens
+_UNSAFE_CHARS_RE = re.compile(r'[^\w -]|_')
+_HYPHEN_RUN_RE = re.compile(r'-{2,}')
+
+_BYTE_UNITS = ('Bytes', 'KB', 'MB', 'GB', 'TB')
+
+
+@lru_cache(maxsize=4096)
 def sanitize_file_name(name: str | None) -> str:
     """Convert name to filesystem-safe name.
 
+    Results are memoized, since the same list, board and workspace names are
+    sanitized again for every card.
+
     Args:
         name: The name to sanitize.
 
@@ -15,24 +32,45 @@ def sanitize_file_name(name: str | None) -> str:
     if not name or not isinstance(name, str):
         return 'untitled'
     
-    name = name.lower().strip()
     # Remove special chars except spaces and hyphens
-    name = ''.join(c if c.isalnum() or c in (' ', '-') else '' for c in name)
-    # Replace spaces with hyphens
-    name = name.replace(' ', '-')
-    # Replace multiple hyphens with single
-    while '--' in name:
-        name = name.replace('--', '-')
-    # Remove leading/trailing hyphens
-    name = name.strip('-')
+    name = _UNSAFE_CHARS_RE.sub('', name.lower().strip())
+    # Replace spaces with hyphens, collapse runs of hyphens and trim them
+    name = _HYPHEN_RUN_RE.sub('-', name.replace(' ', '-')).strip('-')
     # Limit length
-    name = name[:100] if len(name) > 100 else name
-    return name or 'untitled'
+    return name[:100] or 'untitled'
+
+
+def parse_iso_timestamp(date_str: str) -> float:
+    """Parse an ISO 8601 date string into a POSIX timestamp.
+
+    Uses ``ciso8601`` when it is installed and falls back to
+    ``datetime.fromisoformat`` otherwise. Naive dates are treated as UTC,
+    matching the ``Z`` suffix Trello puts on every timestamp.
+
+    Args:
+        date_str: ISO 8601 date string (e.g. '2024-01-20T12:00:00.000Z').
+
+    Returns:
+        Seconds since the epoch as a float.
+
+    Raises:
+        ValueError: If date_str is not a valid ISO 8601 date.
+    """
+    if _parse_datetime is not None:
+        dt = _parse_datetime(date_str)
+    else:
+        dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
 
 
+@lru_cache(maxsize=4096)
 def format_iso_date(date_str: str | None) -> str | None:
     """Format date to ISO 8601 format.
 
+    Results are memoized, since many cards and attachments share timestamps.
+
     Args:
         date_str: Date string to format, can be None.
 
@@ -48,9 +86,12 @@ def format_iso_date(date_str: str | None) -> str | None:
         return date_str
 
 
+@lru_cache(maxsize=4096)
 def format_date(date_str: str | None) -> str:
     """Format date for display.
 
+    Results are memoized, since many cards and attachments share timestamps.
+
     Args:
         date_str: Date string to format, can be None.
 
@@ -78,10 +119,9 @@ def format_bytes(bytes_val: int | None) -> str:
     """
     if not bytes_val:
         return ''
-    val = float(bytes_val)
-    for unit in ['Bytes', 'KB', 'MB', 'GB']:
-        if val < 1024.0:
-            return f"{val:.1f} {unit}"
-        val /= 1024.0
-    return f"{val:.1f} TB"
+    # Each unit is 2**10 of the previous one, so the bit length picks the unit
+    exp = 0
+    if bytes_val > 0:
+        exp = min(max((int(bytes_val).bit_length() - 1) // 10, 0), len(_BYTE_UNITS) - 1)
+    return f"{bytes_val / (1 << (exp * 10)):.1f} {_BYTE_UNITS[exp]}"
 
@@ -2,7 +2,8 @@
 
 import hashlib
 import json
-from datetime import datetime
+import re
+from functools import lru_cache
 from typing import Any
 
 from trello_sync.utils.formatting import (
@@ -11,6 +12,33 @@ from trello_sync.utils.formatting import (
     format_iso_date,
 )
 
+# Keys that can be written unquoted: word characters and hyphens, not only '_'/'-'
+_YAML_SAFE_KEY_RE = re.compile(r'[\w-]*[^\W_][\w-]*')
+
+# Fields copied into the frontmatter, in output order
+_LABEL_FIELDS = ('name', 'color', 'id')
+_MEMBER_FIELDS = ('fullName', 'username', 'id', 'initials')
+_COVER_FIELDS = ('color', 'brightness', 'size', 'idAttachment', 'url')
+
+# Indentation prefixes for the nesting depths the frontmatter uses
+_INDENTS = tuple('  ' * depth for depth in range(8))
+
+# Escapes for double-quoted YAML scalars
+_YAML_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n'})
+
+
+@lru_cache(maxsize=2048)
+def _content_hash8(text: str) -> str:
+    """Short content hash used to detect edited comments.
+    
+    Args:
+        text: Comment text.
+        
+    Returns:
+        8 hex digits of a 4-byte BLAKE2b digest of the text.
+    """
+    return hashlib.blake2b(text.encode(), digest_size=4).hexdigest()
+
 
 def _format_yaml_key(key: str) -> str:
     """Format a YAML key, quoting if necessary.
@@ -22,62 +50,63 @@ def _format_yaml_key(key: str) -> str:
         Formatted key string.
     """
     key_str = str(key)
-    # Quote if contains spaces, colons, or special characters
-    if ' ' in key_str or ':' in key_str or '"' in key_str or not key_str.replace('_', '').replace('-', '').isalnum():
-        return json.dumps(key_str)
-    return key_str
+    # Quote unless made of letters, digits, '_' and '-' with at least one letter or digit
+    if _YAML_SAFE_KEY_RE.fullmatch(key_str):
+        return key_str
+    return json.dumps(key_str)
 
 
-def _format_yaml_value(key: str, value: Any, indent: int = 0) -> list[str]:
-    """Format a YAML value, handling nested structures.
+def _emit_yaml_value(out: list[str], key: str, value: Any, indent: int = 0) -> None:
+    """Append the YAML lines for a key-value pair, handling nested structures.
+    
+    Nested values are written straight into ``out`` rather than returned and
+    merged, so no intermediate lists are built.
     
     Args:
+        out: Line buffer to append to.
         key: The YAML key.
         value: The value to format.
         indent: Current indentation level.
-        
-    Returns:
-        List of YAML lines for this key-value pair.
     """
-    indent_str = '  ' * indent
-    lines: list[str] = []
-    
     if value is None:
-        return []
+        return
+    
+    indent_str = _INDENTS[indent] if indent < len(_INDENTS) else '  ' * indent
     
-    if isinstance(value, dict):
+    # Exact-type check for the common case (checklist and comment IDs are
+    # strings) before the isinstance chain below
+    if value.__class__ is str:
+        out.append(f'{indent_str}{key}: "{value.translate(_YAML_ESCAPES)}"')
+    elif isinstance(value, dict):
         if not value:
-            lines.append(f'{indent_str}{key}: {{}}')
+            out.append(f'{indent_str}{key}: {{}}')
         else:
-            lines.append(f'{indent_str}{key}:')
+            out.append(f'{indent_str}{key}:')
             for k, v in value.items():
-                # Format the nested key properly
-                k_str = _format_yaml_key(k)
-                lines.extend(_format_yaml_value(k_str, v, indent + 1))
+                _emit_yaml_value(out, _format_yaml_key(k), v, indent + 1)
     elif isinstance(value, list):
         if not value:
-            lines.append(f'{indent_str}{key}: []')
+            out.append(f'{indent_str}{key}: []')
+        elif isinstance(value[0], dict):
+            # List of dicts (like comment IDs)
+            out.append(f'{indent_str}{key}:')
+            for item in value:
+                out.append(f'{indent_str}  -')
+                for k, v in item.items():
+                    _emit_yaml_value(out, _format_yaml_key(k), v, indent + 2)
+        elif all(v.__class__ is str for v in value):
+            # Flow-style list of strings, quoted like the scalar string branch
+            items = ', '.join([f'"{v.translate(_YAML_ESCAPES)}"' for v in value])
+            out.append(f'{indent_str}{key}: [{items}]')
         else:
-            # Check if it's a list of dicts (like comment IDs)
-            if value and isinstance(value[0], dict):
-                lines.append(f'{indent_str}{key}:')
-                for item in value:
-                    lines.append(f'{indent_str}  -')
-                    for k, v in item.items():
-                        k_str = _format_yaml_key(k)
-                        lines.extend(_format_yaml_value(k_str, v, indent + 2))
-            else:
-                lines.append(f'{indent_str}{key}: {json.dumps(value)}')
+            out.append(f'{indent_str}{key}: {json.dumps(value)}')
     elif isinstance(value, str):
         # Escape special YAML characters
-        escaped = value.replace('"', '\\"').replace('\n', '\\n')
-        lines.append(f'{indent_str}{key}: "{escaped}"')
+        out.append(f'{indent_str}{key}: "{value.translate(_YAML_ESCAPES)}"')
     elif isinstance(value, bool):
-        lines.append(f'{indent_str}{key}: {str(value).lower()}')
+        out.append(f'{indent_str}{key}: {"true" if value else "false"}')
     else:
-        lines.append(f'{indent_str}{key}: {value}')
-    
-    return lines
+        out.append(f'{indent_str}{key}: {value}')
 
 
 def generate_markdown(
@@ -105,10 +134,20 @@ def generate_markdown(
     """
     if downloaded_attachments is None:
         downloaded_attachments = {}
-    # Extract checklist and checkitem IDs
-    checklists = card_data.get('checklists', [])
+    # Bound lookups used throughout the function
+    card_get = card_data.get
+    downloaded_get = downloaded_attachments.get
+    fmt_iso_date = format_iso_date
+    fmt_date = format_date
+    fmt_bytes = format_bytes
+    
+    # Extract checklist and checkitem IDs, rendering the checklist body in the same pass
+    checklists = card_get('checklists') or ()
     checklist_ids: dict[str, str] = {}
     checkitem_ids: dict[str, dict[str, str]] = {}
+    checklist_body: list[str] = []
+    checklist_append = checklist_body.append
+    checklist_extend = checklist_body.extend
     
     for checklist in checklists:
         checklist_name = checklist.get('name', 'Untitled Checklist')
@@ -116,280 +155,201 @@ def generate_markdown(
         if checklist_id:
             checklist_ids[checklist_name] = checklist_id
         
-        checkitems = checklist.get('checkItems', [])
-        if checkitems:
-            checkitem_ids[checklist_name] = {}
-            for item in checkitems:
-                item_name = item.get('name', '')
-                item_id = item.get('id', '')
-                if item_id and item_name:
-                    checkitem_ids[checklist_name][item_name] = item_id
+        checklist_extend((f'## Checklist: {checklist_name}', ''))
+        # The per-checklist ID map is only created once an item has both an ID and a name
+        item_ids: dict[str, str] | None = None
+        for item in checklist.get('checkItems') or ():
+            item_name = item.get('name', '')
+            item_id = item.get('id', '')
+            if item_id and item_name:
+                if item_ids is None:
+                    item_ids = checkitem_ids[checklist_name] = {}
+                item_ids[item_name] = item_id
+            state = 'x' if item.get('state') == 'complete' else ' '
+            checklist_append(f'- [{state}] {item_name}')
+        checklist_append('')
     
-    # Extract comment IDs
-    comments = card_data.get('comments', [])
+    # Collect comments from the comments array or comment actions
+    comments = card_get('comments') or ()
     if not comments:
-        actions = card_data.get('actions', [])
+        actions = card_get('actions') or ()
         comments = [a for a in actions if a.get('type') == 'commentCard']
     
+    # Extract comment IDs, rendering the comments body in the same pass
     comment_ids: list[dict[str, str]] = []
+    comment_body: list[str] = []
+    comment_ids_append = comment_ids.append
+    comment_extend = comment_body.extend
     for comment in comments:
+        member = comment.get('memberCreator', {}) or comment.get('member', {})
+        author = member.get('fullName', member.get('username', 'Unknown'))
+        date = comment.get('date', '')
+        text = comment.get('data', {}).get('text', '') or comment.get('text', '')
+        
         comment_id = comment.get('id', '')
         if comment_id:
-            member = comment.get('memberCreator', {}) or comment.get('member', {})
-            author = member.get('fullName', member.get('username', 'Unknown'))
-            date = comment.get('date', '')
-            text = comment.get('data', {}).get('text', '') or comment.get('text', '')
-            
             # Create a simple hash of content for matching
-            content_hash = hashlib.md5(text.encode()).hexdigest()[:8] if text else ''
+            content_hash = _content_hash8(text) if text else ''
             
-            comment_ids.append({
+            comment_ids_append({
                 'id': comment_id,
                 'author': author,
                 'date': date,
                 'content_hash': content_hash,
             })
+        
+        comment_extend(
+            (f'#### Comment by {author}', f'**Date:** {fmt_date(date)}', '', text, '', '---', '')
+        )
     
-    # Extract labels with color information (trello-tags)
-    labels_data = card_data.get('labels', [])
-    labels: list[dict[str, Any]] = []
-    for label in labels_data:
-        label_info: dict[str, Any] = {
-            'name': label.get('name', ''),
-        }
-        if label.get('color'):
-            label_info['color'] = label.get('color')
-        if label.get('id'):
-            label_info['id'] = label.get('id')
-        labels.append(label_info)
+    # Extract labels with full information; 'name' is always kept, other fields only when set
+    labels = [
+        {k: v for k in _LABEL_FIELDS if (v := label.get(k, '')) or k == 'name'}
+        for label in card_get('labels') or ()
+    ]
     
-    # Extract members with full information (assigned to)
-    members_data = card_data.get('members', [])
-    members: list[dict[str, Any]] = []
-    for member in members_data:
-        member_info: dict[str, Any] = {
-            'fullName': member.get('fullName', ''),
-        }
-        if member.get('username'):
-            member_info['username'] = member.get('username')
-        if member.get('id'):
-            member_info['id'] = member.get('id')
-        if member.get('initials'):
-            member_info['initials'] = member.get('initials')
-        members.append(member_info)
+    # Extract members with full information (assigned to); 'fullName' is always kept
+    members = [
+        {k: v for k in _MEMBER_FIELDS if (v := member.get(k, '')) or k == 'fullName'}
+        for member in card_get('members') or ()
+    ]
     
     # Extract cover information if present
-    cover = card_data.get('cover')
+    cover = card_get('cover')
     cover_info: dict[str, Any] | None = None
     if cover:
-        cover_info = {}
-        if cover.get('color'):
-            cover_info['color'] = cover.get('color')
-        if cover.get('brightness'):
-            cover_info['brightness'] = cover.get('brightness')
-        if cover.get('size'):
-            cover_info['size'] = cover.get('size')
-        if cover.get('idAttachment'):
-            cover_info['idAttachment'] = cover.get('idAttachment')
-        if cover.get('url'):
-            cover_info['url'] = cover.get('url')
-        if not cover_info:
-            cover_info = None
-    
-    # Frontmatter
-    frontmatter: dict[str, Any] = {
-        'trello_board_card_id': card_data.get('id', ''),
-        'board': board_name,
-        'url': card_data.get('url', ''),
-        'workspace': workspace_name,
-        'created': format_iso_date(card_data.get('dateCreated')),
-        'updated': format_iso_date(card_data.get('dateLastActivity')),
-        'list': list_name,
-        'labels': labels,
-        'members': members,
-        'due-date': format_iso_date(card_data.get('due')),
-        'attachments-count': len(card_data.get('attachments', [])),
-        'comments-count': len(comments),
-        # Additional Trello UI metadata
-        'subscribed': card_data.get('subscribed', False),
-        'closed': card_data.get('closed', False),
-        'idShort': card_data.get('idShort'),
-        'shortUrl': card_data.get('shortUrl'),
-        'dueComplete': card_data.get('dueComplete', False),
-        'start': format_iso_date(card_data.get('start')),
-        'pos': card_data.get('pos'),
-    }
+        cover_info = {k: v for k in _COVER_FIELDS if (v := cover.get(k))} or None
     
-    # Add cover if present
-    if cover_info:
-        frontmatter['cover'] = cover_info
+    attachments = card_get('attachments') or ()
     
-    # Add Phase 2 frontmatter fields
-    if checklist_ids:
-        frontmatter['trello_checklist_ids'] = checklist_ids
-    if checkitem_ids:
-        frontmatter['trello_checkitem_ids'] = checkitem_ids
-    if comment_ids:
-        frontmatter['trello_comment_ids'] = comment_ids
-    
-    # Add sync status fields (default to synced for new cards)
-    frontmatter['last_synced'] = None  # Will be set when local → Trello sync happens
-    frontmatter['sync_status'] = 'synced'  # Default status for cards synced from Trello
-    
-    # Add optional IDs if provided
-    if list_id:
-        frontmatter['trello_list_id'] = list_id
-    if board_id:
-        frontmatter['trello_board_id'] = board_id
-    
-    # Remove None values (but keep empty dicts/lists for structure)
-    frontmatter = {k: v for k, v in frontmatter.items() if v is not None}
-    
-    # Build frontmatter YAML with proper formatting for nested structures
-    yaml_lines = ['---']
-    for key, value in frontmatter.items():
-        if isinstance(value, (dict, list)) and not isinstance(value, str):
-            # Use custom formatter for nested structures
-            lines = _format_yaml_value(key, value, indent=0)
-            yaml_lines.extend(lines)
-        elif isinstance(value, str):
-            # Escape special YAML characters
-            escaped = value.replace('"', '\\"')
-            yaml_lines.append(f'{key}: "{escaped}"')
-        else:
-            yaml_lines.append(f'{key}: {value}')
-    yaml_lines.append('---')
-    yaml_lines.append('')
+    # Frontmatter in output order (None values are omitted but empty
+    # dicts/lists are kept for structure). last_synced is not written until a
+    # local → Trello sync sets it.
+    out = ['---']
+    for key, value in (
+        ('trello_board_card_id', card_get('id', '')),
+        ('board', board_name),
+        ('url', card_get('url', '')),
+        ('workspace', workspace_name),
+        ('created', fmt_iso_date(card_get('dateCreated'))),
+        ('updated', fmt_iso_date(card_get('dateLastActivity'))),
+        ('list', list_name),
+        ('labels', labels),
+        ('members', members),
+        ('due-date', fmt_iso_date(card_get('due'))),
+        ('attachments-count', len(attachments)),
+        ('comments-count', len(comments)),
+        # Additional Trello UI metadata
+        ('subscribed', card_get('subscribed', False)),
+        ('closed', card_get('closed', False)),
+        ('idShort', card_get('idShort')),
+        ('shortUrl', card_get('shortUrl')),
+        ('dueComplete', card_get('dueComplete', False)),
+        ('start', fmt_iso_date(card_get('start'))),
+        ('pos', card_get('pos')),
+        ('cover', cover_info),
+        # Phase 2 fields
+        ('trello_checklist_ids', checklist_ids or None),
+        ('trello_checkitem_ids', checkitem_ids or None),
+        ('trello_comment_ids', comment_ids or None),
+        # Sync status (default to synced for cards synced from Trello)
+        ('sync_status', 'synced'),
+        # Optional IDs if provided
+        ('trello_list_id', list_id or None),
+        ('trello_board_id', board_id or None),
+    ):
+        _emit_yaml_value(out, key, value)
+    out.append('---')
     
-    # Body
-    body_lines = [f"# {card_data.get('name', 'Untitled')}", '']
+    # Body, written into the same buffer as the frontmatter
+    append = out.append
+    extend = out.extend
+    extend((f"# {card_get('name', 'Untitled')}", ''))
     
     # Description
-    desc = card_data.get('desc', '').strip()
+    desc = card_get('desc', '').strip()
     if desc:
-        body_lines.append('## Description')
-        body_lines.append('')
-        body_lines.append(desc)
-        body_lines.append('')
+        extend(('## Description', '', desc, ''))
     
-    # Checklists
-    checklists = card_data.get('checklists', [])
-    if checklists:
-        for checklist in checklists:
-            checklist_name = checklist.get('name', 'Untitled Checklist')
-            body_lines.append(f'## Checklist: {checklist_name}')
-            body_lines.append('')
-            checkitems = checklist.get('checkItems', [])
-            for item in checkitems:
-                state = 'x' if item.get('state') == 'complete' else ' '
-                name = item.get('name', '')
-                body_lines.append(f'- [{state}] {name}')
-            body_lines.append('')
+    # Checklists (rendered while extracting their IDs above)
+    extend(checklist_body)
     
     # Attachments
-    attachments = card_data.get('attachments', [])
     if attachments:
-        # Separate into images, files, and links
-        image_attachments: list[dict[str, Any]] = []
-        file_attachments: list[dict[str, Any]] = []
-        links: list[dict[str, Any]] = []
+        # Separate into images, files, and links as flat rows, reading each
+        # attachment's fields once:
+        #   images: (name, url, local_info)
+        #   files:  (name, url, local_info, bytes, formatted date)
+        #   links:  (name, url, formatted date)
+        image_rows: list[tuple[str, str, dict[str, Any]]] = []
+        file_rows: list[tuple[str, str, dict[str, Any] | None, Any, str]] = []
+        link_rows: list[tuple[str, str, str]] = []
+        image_append = image_rows.append
+        file_append = file_rows.append
+        link_append = link_rows.append
         
+        # Single pass over the attachments, partitioning into all three groups
         for att in attachments:
-            if not att.get('isUpload', False):
-                links.append(att)
+            att_get = att.get
+            name = att_get('name', 'Untitled')
+            url = att_get('url', '')
+            if not att_get('isUpload', False):
+                link_append((name, url, fmt_date(att_get('date', ''))))
+                continue
+            att_info = downloaded_get(att_get('id', ''))
+            if att_info is not None and att_info.get('is_image', False):
+                image_append((name, url, att_info))
             else:
-                att_id = att.get('id', '')
-                if att_id in downloaded_attachments:
-                    att_info = downloaded_attachments[att_id]
-                    if att_info.get('is_image', False):
-                        image_attachments.append({**att, '_local_info': att_info})
-                    else:
-                        file_attachments.append({**att, '_local_info': att_info})
-                else:
-                    # Fallback: treat as file if not downloaded
-                    file_attachments.append(att)
+                # Fallback: treat as file if not downloaded
+                file_append((name, url, att_info, att_get('bytes'), fmt_date(att_get('date', ''))))
         
-        body_lines.append('## Attachments')
-        body_lines.append('')
+        extend(('## Attachments', ''))
         
         # Images (inline)
-        if image_attachments:
-            body_lines.append('### Images')
-            for att in image_attachments:
-                name = att.get('name', 'Untitled')
-                local_info = att.get('_local_info')
-                
+        if image_rows:
+            append('### Images')
+            for name, url, local_info in image_rows:
                 if local_info:
                     local_path = local_info.get('local_path', '')
-                    original_url = local_info.get('original_url', att.get('url', ''))
+                    original_url = local_info.get('original_url', url)
                     # Inline image syntax for Obsidian
-                    body_lines.append(f'![{name}]({local_path})')
+                    append(f'![{name}]({local_path})')
                     if original_url:
-                        body_lines.append(f'*Original: [{name}]({original_url})*')
+                        append(f'*Original: [{name}]({original_url})*')
                 else:
                     # Fallback to original URL
-                    url = att.get('url', '')
-                    body_lines.append(f'![{name}]({url})')
-                body_lines.append('')
+                    append(f'![{name}]({url})')
+                append('')
         
         # Files (links)
-        if file_attachments:
-            body_lines.append('### Files')
-            for att in file_attachments:
-                name = att.get('name', 'Untitled')
-                local_info = att.get('_local_info')
-                bytes_val = att.get('bytes')
-                date = format_date(att.get('date', ''))
-                
+        if file_rows:
+            append('### Files')
+            for name, url, local_info, bytes_val, date in file_rows:
+                size_str = f" ({fmt_bytes(bytes_val)}, added {date})" if bytes_val else f" (added {date})" if date else ""
                 if local_info:
                     local_path = local_info.get('local_path', '')
-                    original_url = local_info.get('original_url', att.get('url', ''))
-                    size_str = f" ({format_bytes(bytes_val)}, added {date})" if bytes_val else f" (added {date})" if date else ""
-                    body_lines.append(f'- [{name}]({local_path}){size_str}')
+                    original_url = local_info.get('original_url', url)
+                    append(f'- [{name}]({local_path}){size_str}')
                     if original_url:
-                        body_lines.append(f'  Original: [{name}]({original_url})')
+                        append(f'  Original: [{name}]({original_url})')
                 else:
                     # Fallback to original URL
-                    url = att.get('url', '')
-                    size_str = f" ({format_bytes(bytes_val)}, added {date})" if bytes_val else f" (added {date})" if date else ""
-                    body_lines.append(f'- [{name}]({url}){size_str}')
-            body_lines.append('')
+                    append(f'- [{name}]({url}){size_str}')
+            append('')
         
         # Links
-        if links:
-            body_lines.append('### Links')
-            for att in links:
-                name = att.get('name', 'Untitled')
-                url = att.get('url', '')
-                date = format_date(att.get('date', ''))
+        if link_rows:
+            append('### Links')
+            for name, url, date in link_rows:
                 date_str = f" (added {date})" if date else ""
-                body_lines.append(f'- [{name}]({url}){date_str}')
-            body_lines.append('')
+                append(f'- [{name}]({url}){date_str}')
+            append('')
     
     # Comments - handle both direct comments array and actions array
-    # (comments variable already extracted above for frontmatter)
+    # (rendered while extracting their IDs above)
     if comments:
-        body_lines.append('## Comments')
-        body_lines.append('')
-        for comment in comments:
-            member = comment.get('memberCreator', {})
-            if not member:
-                member = comment.get('member', {})
-            full_name = member.get('fullName', member.get('username', 'Unknown'))
-            date = format_date(comment.get('date', ''))
-            text = comment.get('data', {}).get('text', '')
-            if not text:
-                text = comment.get('text', '')
-            
-            body_lines.append(f'#### Comment by {full_name}')
-            body_lines.append(f'**Date:** {date}')
-            body_lines.append('')
-            body_lines.append(text)
-            body_lines.append('')
-            body_lines.append('---')
-            body_lines.append('')
+        extend(('## Comments', ''))
+        extend(comment_body)
     
-    # Combine
-    content = '\n'.join(yaml_lines) + '\n'.join(body_lines)
-    return content
+    return '\n'.join(out)
 
@@ -0,0 +1,37 @@
+"""Shared pytest fixtures."""
+
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from trello_sync.utils.config import clear_config_cache
+
+
+@pytest.fixture(scope='session')
+def base_card_data() -> dict[str, Any]:
+    """Minimal Trello card shared by markdown tests.
+    
+    Tests build variants with ``{**base_card_data, ...}`` and must not mutate it.
+    """
+    return {
+        'id': 'test123',
+        'name': 'Test Card',
+        'url': 'https://trello.com/c/test123',
+        'desc': '',
+        'dateCreated': '2024-01-20T12:00:00Z',
+        'dateLastActivity': '2024-01-21T12:00:00Z',
+        'labels': [],
+        'members': [],
+        'attachments': [],
+        'comments': [],
+        'checklists': [],
+    }
+
+
+@pytest.fixture(autouse=True)
+def reset_config_caches() -> Iterator[None]:
+    """Keep config, config path and Obsidian root caches from leaking between tests."""
+    clear_config_cache()
+    yield
+    clear_config_cache()
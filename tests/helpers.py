@@ -0,0 +1,44 @@
+"""Shared test helpers."""
+
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+
+def read_yaml(path: Path) -> Any:
+    """Parse a YAML file.
+    
+    Args:
+        path: File to read
+    
+    Returns:
+        Parsed YAML data
+    """
+    return yaml.load(path.read_bytes(), Loader=_YAML_LOADER)
+
+
+def parse_frontmatter(markdown: str) -> dict[str, Any]:
+    """Parse the YAML frontmatter block at the top of a generated card.
+    
+    Args:
+        markdown: Output of generate_markdown
+    
+    Returns:
+        Frontmatter as a dictionary
+    """
+    _, frontmatter, _ = markdown.split('---\n', 2)
+    return yaml.load(frontmatter, Loader=_YAML_LOADER)
+
+
+def write_yaml(path: Path, data: Any) -> None:
+    """Write data to path as UTF-8 YAML.
+    
+    Args:
+        path: File to write
+        data: Data to serialize
+    """
+    path.write_bytes(yaml.dump(data, Dumper=_YAML_DUMPER, sort_keys=False, encoding='utf-8'))
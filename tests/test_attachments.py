@@ -157,3 +157,17 @@ def test_download_attachment_missing_url(tmp_path: Path) -> None:
     with pytest.raises(ValueError, match="missing 'url'"):
         download_attachment(attachment_data, target_path, 'api_key', 'token')
 
+
+def test_get_asset_path_skips_created_dirs(tmp_path: Path) -> None:
+    """Test that get_asset_path only creates the assets folder once."""
+    card_path = tmp_path / 'cards' / 'test-card.md'
+    assets_folder = tmp_path / 'assets'
+    created_dirs: set[str] = set()
+    
+    get_asset_path(card_path, 'first.png', assets_folder, created_dirs)
+    assert assets_folder.exists()
+    assert created_dirs == {str(assets_folder)}
+    
+    assets_folder.rmdir()
+    get_asset_path(card_path, 'second.png', assets_folder, created_dirs)
+    assert not assets_folder.exists()
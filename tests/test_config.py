@@ -1,14 +1,17 @@
 """Tests for configuration utilities."""
 
 import os
+from collections.abc import Callable
 from pathlib import Path
-from unittest.mock import patch
 
 import pytest
-import yaml
 
+from tests.helpers import write_yaml
 from trello_sync.utils.config import (
     ConfigError,
+    ValidationError,
+    clear_config_cache,
+    compile_path_template,
     get_board_config,
     get_config_path,
     get_obsidian_root,
@@ -18,19 +21,76 @@ from trello_sync.utils.config import (
     validate_config,
 )
 
+# Shared config for the read-only tests; written once per module
+SAMPLE_CONFIG = {
+    'obsidian_root': '/test/obsidian',
+    'default_assets_folder': '.test_assets',
+    'boards': [
+        {
+            'board_id': 'board123',
+            'enabled': True,
+            'target_path': 'test/{org}/{board}/{column}/{card}.md',
+        },
+        {
+            'board_id': 'board456',
+            'enabled': False,
+        },
+    ],
+}
 
-def test_resolve_path_template() -> None:
+
+@pytest.fixture(scope='module')
+def sample_config_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Directory containing a trello-sync.yaml with SAMPLE_CONFIG."""
+    config_dir = tmp_path_factory.mktemp('sample_config')
+    write_yaml(config_dir / 'trello-sync.yaml', SAMPLE_CONFIG)
+    return config_dir
+
+
+PATH_VARIABLES = {
+    'org': 'test-org',
+    'board': 'test-board',
+    'column': 'test-column',
+    'card': 'test-card',
+}
+
+
+@pytest.mark.parametrize(
+    'template,sanitize_func,expected',
+    [
+        (
+            "20_tasks/Trello/{org}/{board}/{column}/{card}.md",
+            None,
+            "20_tasks/Trello/test-org/test-board/test-column/test-card.md",
+        ),
+        # Unknown placeholders are left as-is
+        ("{org}/{unknown}", None, "test-org/{unknown}"),
+        # Values can be sanitized during substitution
+        ("{org}/{card}.md", str.upper, "TEST-ORG/TEST-CARD.md"),
+    ],
+)
+def test_resolve_path_template(
+    template: str, sanitize_func: Callable[[str], str] | None, expected: str
+) -> None:
     """Test path template resolution."""
-    template = "20_tasks/Trello/{org}/{board}/{column}/{card}.md"
-    variables = {
-        'org': 'test-org',
-        'board': 'test-board',
-        'column': 'test-column',
-        'card': 'test-card',
-    }
+    assert resolve_path_template(template, PATH_VARIABLES, sanitize_func) == expected
+
+
+def test_compile_path_template() -> None:
+    """Test a compiled template renders different variables and is cached."""
+    render = compile_path_template("{board}/{column}/{card}.md")
+    
+    assert render({'board': 'b', 'column': 'c', 'card': 'one'}) == "b/c/one.md"
+    assert render({'board': 'b', 'column': 'c', 'card': 'two'}) == "b/c/two.md"
+    assert render({'board': 'b'}) == "b/{column}/{card}.md"
+    assert compile_path_template("{board}/{column}/{card}.md") is render
+
+
+def test_resolve_path_template_no_placeholders() -> None:
+    """Test templates without placeholders are returned unchanged."""
+    template = '.local_assets/Trello'
     
-    result = resolve_path_template(template, variables)
-    assert result == "20_tasks/Trello/test-org/test-board/test-column/test-card.md"
+    assert resolve_path_template(template, {'org': 'test-org'}) is template
 
 
 def test_load_config_missing_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
@@ -44,67 +104,123 @@ def test_load_config_missing_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatc
     assert config['boards'] == []
 
 
-def test_load_config_existing_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    """Test loading config from existing file."""
-    monkeypatch.chdir(tmp_path)
+def test_get_config_path_parent_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test config file is found in the parent directory and the result is cached."""
+    config_file = tmp_path / 'trello-sync.yaml'
+    config_file.write_text('boards: []\n', encoding='utf-8')
+    subdir = tmp_path / 'subdir'
+    subdir.mkdir()
+    monkeypatch.chdir(subdir)
     
-    config_data = {
-        'obsidian_root': '/test/obsidian',
-        'default_assets_folder': '.test_assets',
-        'boards': [
-            {
-                'board_id': 'board123',
-                'enabled': True,
-                'target_path': 'test/{board}/{card}.md',
-            }
-        ],
-    }
+    assert get_config_path() == config_file
+    
+    # Later lookups from the same directory don't touch the filesystem
+    monkeypatch.setattr(Path, 'exists', lambda self: pytest.fail('unexpected exists() call'))
+    assert get_config_path() == config_file
+
+
+def test_clear_config_cache_resets_config_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a config file created after the first lookup is found once the cache is cleared."""
+    subdir = tmp_path / 'subdir'
+    subdir.mkdir()
+    monkeypatch.chdir(subdir)
+    assert get_config_path() == subdir / 'trello-sync.yaml'
     
     config_file = tmp_path / 'trello-sync.yaml'
-    with open(config_file, 'w') as f:
-        yaml.dump(config_data, f)
+    config_file.write_text('boards: []\n', encoding='utf-8')
+    assert get_config_path() == subdir / 'trello-sync.yaml'
+    
+    clear_config_cache()
+    assert get_config_path() == config_file
+
+
+def test_load_config_existing_file(sample_config_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test loading config from existing file."""
+    monkeypatch.chdir(sample_config_dir)
     
     config = load_config()
     
     assert config['obsidian_root'] == '/test/obsidian'
     assert config['default_assets_folder'] == '.test_assets'
-    assert len(config['boards']) == 1
+    assert len(config['boards']) == 2
     assert config['boards'][0]['board_id'] == 'board123'
 
 
-def test_get_board_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    """Test getting board configuration."""
+def test_load_config_cached_until_file_changes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test load_config reuses the parsed file until it changes."""
     monkeypatch.chdir(tmp_path)
+    config_file = tmp_path / 'trello-sync.yaml'
+    config_file.write_text('obsidian_root: /first\n', encoding='utf-8')
     
-    config_data = {
-        'boards': [
-            {
-                'board_id': 'board123',
-                'enabled': True,
-                'target_path': 'test/{board}/{card}.md',
-            },
-            {
-                'board_id': 'board456',
-                'enabled': False,
-            },
-        ],
-    }
+    config = load_config()
+    config['obsidian_root'] = '/modified'
+    assert load_config()['obsidian_root'] == '/first'
     
+    config_file.write_text('obsidian_root: /second/path\n', encoding='utf-8')
+    assert load_config()['obsidian_root'] == '/second/path'
+
+
+def test_clear_config_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test clear_config_cache forces a re-read of an edit the stat check can't see."""
+    monkeypatch.chdir(tmp_path)
     config_file = tmp_path / 'trello-sync.yaml'
-    with open(config_file, 'w') as f:
-        yaml.dump(config_data, f)
+    config_file.write_text('obsidian_root: /aaaa\n', encoding='utf-8')
+    assert load_config()['obsidian_root'] == '/aaaa'
     
-    board_config = get_board_config('board123')
-    assert board_config is not None
-    assert board_config['board_id'] == 'board123'
-    assert board_config['enabled'] is True
+    # Same size and mtime as before
+    original_stat = config_file.stat()
+    config_file.write_text('obsidian_root: /bbbb\n', encoding='utf-8')
+    os.utime(config_file, ns=(original_stat.st_atime_ns, original_stat.st_mtime_ns))
+    assert load_config()['obsidian_root'] == '/aaaa'
     
-    board_config = get_board_config('board456')
-    assert board_config is not None
-    assert board_config['enabled'] is False
+    clear_config_cache()
+    assert load_config()['obsidian_root'] == '/bbbb'
+
+
+@pytest.mark.parametrize('from_file', [True, False])
+@pytest.mark.parametrize(
+    'board_id,expected_enabled',
+    [('board123', True), ('board456', False), ('nonexistent', None)],
+)
+def test_get_board_config(
+    board_id: str,
+    expected_enabled: bool | None,
+    from_file: bool,
+    sample_config_dir: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test getting board configuration from the config file or a loaded config."""
+    monkeypatch.chdir(sample_config_dir)
+    
+    config = None if from_file else SAMPLE_CONFIG
+    board_config = get_board_config(board_id, config)
+    
+    if expected_enabled is None:
+        assert board_config is None
+    else:
+        assert board_config is not None
+        assert board_config['board_id'] == board_id
+        assert board_config['enabled'] is expected_enabled
+
+
+@pytest.mark.parametrize('from_file', [True, False])
+def test_get_board_config_enabled_only(
+    from_file: bool, sample_config_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test include_disabled=False treats disabled boards as not configured."""
+    monkeypatch.chdir(sample_config_dir)
+    config = None if from_file else SAMPLE_CONFIG
+    
+    assert get_board_config('board123', config, include_disabled=False)['enabled'] is True
+    assert get_board_config('board456', config, include_disabled=False) is None
+
+
+def test_get_board_config_returns_copy(sample_config_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test each call hands out its own copy of the indexed board."""
+    monkeypatch.chdir(sample_config_dir)
     
-    board_config = get_board_config('nonexistent')
-    assert board_config is None
+    get_board_config('board123')['enabled'] = False
+    assert get_board_config('board123')['enabled'] is True
 
 
 def test_get_obsidian_root_from_env(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
@@ -132,13 +248,20 @@ def test_get_obsidian_root_from_config(tmp_path: Path, monkeypatch: pytest.Monke
     }
     
     config_file = tmp_path / 'trello-sync.yaml'
-    with open(config_file, 'w') as f:
-        yaml.dump(config_data, f)
+    write_yaml(config_file, config_data)
     
     result = get_obsidian_root()
     assert result == obsidian_path
 
 
+def test_get_obsidian_root_expands_home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a '~' Obsidian root is expanded against the current HOME."""
+    (tmp_path / 'vault').mkdir()
+    monkeypatch.setenv('HOME', str(tmp_path))
+    
+    assert get_obsidian_root({'obsidian_root': '~/vault'}) == tmp_path / 'vault'
+
+
 def test_get_obsidian_root_missing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     """Test getting Obsidian root when not configured."""
     monkeypatch.chdir(tmp_path)
@@ -159,22 +282,21 @@ def test_get_obsidian_root_nonexistent(tmp_path: Path, monkeypatch: pytest.Monke
         get_obsidian_root()
 
 
-def test_validate_config_valid(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    """Test validating valid configuration."""
+def test_get_obsidian_root_not_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test getting Obsidian root when path is a file."""
     monkeypatch.chdir(tmp_path)
     
-    config_data = {
-        'boards': [
-            {
-                'board_id': 'board123',
-                'target_path': 'test/{org}/{board}/{column}/{card}.md',
-            }
-        ],
-    }
+    file_path = tmp_path / 'vault.txt'
+    file_path.write_text('not a vault', encoding='utf-8')
+    monkeypatch.setenv('OBSIDIAN_ROOT', str(file_path))
     
-    config_file = tmp_path / 'trello-sync.yaml'
-    with open(config_file, 'w') as f:
-        yaml.dump(config_data, f)
+    with pytest.raises(ConfigError, match="not a directory"):
+        get_obsidian_root()
+
+
+def test_validate_config_valid(sample_config_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test validating valid configuration."""
+    monkeypatch.chdir(sample_config_dir)
     
     errors = validate_config()
     assert len(errors) == 0
@@ -194,13 +316,13 @@ def test_validate_config_missing_variables(tmp_path: Path, monkeypatch: pytest.M
     }
     
     config_file = tmp_path / 'trello-sync.yaml'
-    with open(config_file, 'w') as f:
-        yaml.dump(config_data, f)
+    write_yaml(config_file, config_data)
     
-    errors = validate_config()
-    assert len(errors) > 0
-    assert any('{column}' in error for error in errors)
-    assert any('{card}' in error for error in errors)
+    errors = set(validate_config())
+    assert errors == {
+        ValidationError('missing_template_var', 'board123', 'column'),
+        ValidationError('missing_template_var', 'board123', 'card'),
+    }
 
 
 def test_validate_config_missing_board_id(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
@@ -216,12 +338,44 @@ def test_validate_config_missing_board_id(tmp_path: Path, monkeypatch: pytest.Mo
     }
     
     config_file = tmp_path / 'trello-sync.yaml'
-    with open(config_file, 'w') as f:
-        yaml.dump(config_data, f)
+    write_yaml(config_file, config_data)
     
     errors = validate_config()
-    assert len(errors) > 0
-    assert any('board_id' in error.lower() for error in errors)
+    assert errors == [ValidationError('missing_board_field', '0', 'board_id')]
+
+
+def test_validate_config_wrong_types() -> None:
+    """Test validating config values of the wrong type."""
+    config = {
+        'obsidian_root': 42,
+        'boards': [
+            {'board_id': 'board123', 'target_path': ['not', 'a', 'string']},
+        ],
+    }
+    
+    errors = validate_config(config)
+    assert errors == [
+        ValidationError('invalid_type', 'obsidian_root', 'a string'),
+        ValidationError('invalid_board_field_type', 'board123', 'target_path'),
+    ]
+
+
+def test_validation_error_str() -> None:
+    """Test validation errors render as the CLI's human-readable messages."""
+    config = {
+        'obsidian_root': 42,
+        'boards': [
+            'not a dict',
+            {'target_path': 'test/{org}/{board}/{column}.md'},
+        ],
+    }
+    
+    assert [str(error) for error in validate_config(config)] == [
+        "'obsidian_root' must be a string",
+        'Board config at index 0 must be a dictionary',
+        "Board config at index 1 missing 'board_id'",
+        'Board unknown target_path missing required variable: {card}',
+    ]
 
 
 def test_save_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
@@ -255,6 +409,7 @@ def test_save_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     # Verify file was created
     config_file = tmp_path / 'trello-sync.yaml'
     assert config_file.exists()
+    assert not (tmp_path / 'trello-sync.yaml.tmp').exists()
     
     # Load and verify
     saved_config = load_config()
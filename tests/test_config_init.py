@@ -1,16 +1,63 @@
 """Tests for config-init CLI command."""
 
-import yaml
+import importlib
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from types import MappingProxyType
+from unittest.mock import MagicMock
 
 import pytest
 from click.testing import CliRunner
 
-from trello_sync.cli.commands import cli
+from tests.helpers import read_yaml, write_yaml
+from trello_sync.cli.commands import cli, config_init_impl
+from trello_sync.services.trello_sync import TrelloSync
 
+# trello_sync.cli resolves to the click group re-exported by the package, so
+# dotted-path patching can't reach the commands module
+cli_commands = importlib.import_module('trello_sync.cli.commands')
 
-def test_config_init_new_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+# Trello board details by ID, shared read-only by the update and --force tests
+BOARD_DETAILS = MappingProxyType({
+    'board1': {
+        'id': 'board1',
+        'name': 'Board 1 Updated',
+        'organization': {'displayName': 'New Org'},
+    },
+    'board2': {
+        'id': 'board2',
+        'name': 'Board 2',
+        'organization': None,
+    },
+    'board3': {
+        'id': 'board3',
+        'name': 'New Board 3',
+        'organization': {'displayName': 'Org 3'},
+    },
+    'new_board': {
+        'id': 'new_board',
+        'name': 'New Board',
+        'organization': None,
+    },
+})
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Click test runner."""
+    return CliRunner()
+
+
+@pytest.fixture
+def mock_trello(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Trello client returned by every TrelloSync() call in the CLI."""
+    mock = MagicMock(spec=TrelloSync)
+    monkeypatch.setattr(cli_commands, 'TrelloSync', lambda *args, **kwargs: mock)
+    return mock
+
+
+def test_config_init_new_file(
+    runner: CliRunner, mock_trello: MagicMock, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
     """Test config-init creates new file when none exists."""
     monkeypatch.chdir(tmp_path)
     
@@ -33,37 +80,37 @@ def test_config_init_new_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -
         },
     ]
     
-    with patch('trello_sync.cli.commands.TrelloSync') as mock_sync_class:
-        mock_sync = MagicMock()
-        mock_sync.get_boards.return_value = mock_boards
-        mock_sync.get_board.side_effect = mock_board_details
-        mock_sync_class.return_value = mock_sync
-        
-        runner = CliRunner()
-        result = runner.invoke(cli, ['config-init'])
-        
-        assert result.exit_code == 0
-        assert 'Creating new configuration file' in result.output
-        assert 'Found 2 accessible boards' in result.output
-        
-        # Check file was created
-        config_file = tmp_path / 'trello-sync.yaml'
-        assert config_file.exists()
-        
-        # Check config content
-        with open(config_file, 'r') as f:
-            config = yaml.safe_load(f)
-        
-        assert len(config['boards']) == 2
-        assert config['boards'][0]['board_id'] == 'board1'
-        assert config['boards'][0]['board_name'] == 'Board 1'
-        assert config['boards'][0]['org'] == 'Org 1'
-        assert config['boards'][0]['enabled'] is False
-        assert config['boards'][1]['board_id'] == 'board2'
-        assert config['boards'][1]['org'] == ''
+    mock_trello.get_boards.return_value = mock_boards
+    mock_trello.get_board.side_effect = mock_board_details
+    
+    result = runner.invoke(cli, ['config-init'])
+    
+    assert result.exit_code == 0
+    assert 'Creating new configuration file' in result.output
+    assert 'Found 2 accessible boards' in result.output
+    
+    # Check file was created
+    config_file = tmp_path / 'trello-sync.yaml'
+    assert config_file.exists()
+    
+    # Check config content
+    config = read_yaml(config_file)
+    
+    assert len(config['boards']) == 2
+    assert config['boards'][0]['board_id'] == 'board1'
+    assert config['boards'][0]['board_name'] == 'Board 1'
+    assert config['boards'][0]['org'] == 'Org 1'
+    assert config['boards'][0]['enabled'] is False
+    assert config['boards'][1]['board_id'] == 'board2'
+    assert config['boards'][1]['org'] == ''
 
 
-def test_config_init_updates_existing_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+def test_config_init_updates_existing_file(
+    capsys: pytest.CaptureFixture[str],
+    mock_trello: MagicMock,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
     """Test config-init updates existing file, adding missing boards and removing deleted ones."""
     monkeypatch.chdir(tmp_path)
     
@@ -94,8 +141,7 @@ def test_config_init_updates_existing_file(tmp_path: Path, monkeypatch: pytest.M
     }
     
     config_file = tmp_path / 'trello-sync.yaml'
-    with open(config_file, 'w') as f:
-        yaml.dump(existing_config, f)
+    write_yaml(config_file, existing_config)
     
     # Mock Trello API - board1 and board2 exist, deleted_board doesn't
     mock_boards = [
@@ -104,70 +150,48 @@ def test_config_init_updates_existing_file(tmp_path: Path, monkeypatch: pytest.M
         {'id': 'board3', 'name': 'New Board 3'},
     ]
     
-    mock_board_details = {
-        'board1': {
-            'id': 'board1',
-            'name': 'Board 1 Updated',
-            'organization': {'displayName': 'New Org'},
-        },
-        'board2': {
-            'id': 'board2',
-            'name': 'Board 2',
-            'organization': None,
-        },
-        'board3': {
-            'id': 'board3',
-            'name': 'New Board 3',
-            'organization': {'displayName': 'Org 3'},
-        },
-    }
+    mock_trello.get_boards.return_value = mock_boards
+    mock_trello.get_board.side_effect = BOARD_DETAILS.__getitem__
+    
+    assert config_init_impl(force=False) == config_file
+    output = capsys.readouterr().out
+    assert 'Existing boards in config: 3' in output
+    assert 'Boards to add: 1' in output
+    assert 'Boards to remove: 1' in output
+    
+    # Check config was updated
+    config = read_yaml(config_file)
+    
+    board_ids = {b['board_id'] for b in config['boards']}
+    assert 'board1' in board_ids
+    assert 'board2' in board_ids
+    assert 'board3' in board_ids
+    assert 'deleted_board' not in board_ids
+    
+    # Check board1 settings were preserved
+    board1 = next(b for b in config['boards'] if b['board_id'] == 'board1')
+    assert board1['enabled'] is True
+    assert board1['target_path'] == 'custom/path/{org}/{board}/{column}/{card}.md'
+    assert board1['board_name'] == 'Board 1 Updated'  # Updated name
+    assert board1['org'] == 'New Org'  # Updated org
+    
+    # Check board2 settings were preserved
+    board2 = next(b for b in config['boards'] if b['board_id'] == 'board2')
+    assert board2['enabled'] is False
     
-    def get_board_side_effect(board_id: str) -> dict:
-        return mock_board_details[board_id]
-    
-    with patch('trello_sync.cli.commands.TrelloSync') as mock_sync_class:
-        mock_sync = MagicMock()
-        mock_sync.get_boards.return_value = mock_boards
-        mock_sync.get_board.side_effect = get_board_side_effect
-        mock_sync_class.return_value = mock_sync
-        
-        runner = CliRunner()
-        result = runner.invoke(cli, ['config-init'])
-        
-        assert result.exit_code == 0
-        assert 'Existing boards in config: 3' in result.output
-        assert 'Boards to add: 1' in result.output
-        assert 'Boards to remove: 1' in result.output
-        
-        # Check config was updated
-        with open(config_file, 'r') as f:
-            config = yaml.safe_load(f)
-        
-        board_ids = {b['board_id'] for b in config['boards']}
-        assert 'board1' in board_ids
-        assert 'board2' in board_ids
-        assert 'board3' in board_ids
-        assert 'deleted_board' not in board_ids
-        
-        # Check board1 settings were preserved
-        board1 = next(b for b in config['boards'] if b['board_id'] == 'board1')
-        assert board1['enabled'] is True
-        assert board1['target_path'] == 'custom/path/{org}/{board}/{column}/{card}.md'
-        assert board1['board_name'] == 'Board 1 Updated'  # Updated name
-        assert board1['org'] == 'New Org'  # Updated org
-        
-        # Check board2 settings were preserved
-        board2 = next(b for b in config['boards'] if b['board_id'] == 'board2')
-        assert board2['enabled'] is False
-        
-        # Check new board was added
-        board3 = next(b for b in config['boards'] if b['board_id'] == 'board3')
-        assert board3['board_name'] == 'New Board 3'
-        assert board3['org'] == 'Org 3'
-        assert board3['enabled'] is False  # Default for new boards
+    # Check new board was added
+    board3 = next(b for b in config['boards'] if b['board_id'] == 'board3')
+    assert board3['board_name'] == 'New Board 3'
+    assert board3['org'] == 'Org 3'
+    assert board3['enabled'] is False  # Default for new boards
 
 
-def test_config_init_force_overwrite(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+def test_config_init_force_overwrite(
+    capsys: pytest.CaptureFixture[str],
+    mock_trello: MagicMock,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
     """Test config-init --force overwrites existing file."""
     monkeypatch.chdir(tmp_path)
     
@@ -183,43 +207,30 @@ def test_config_init_force_overwrite(tmp_path: Path, monkeypatch: pytest.MonkeyP
     }
     
     config_file = tmp_path / 'trello-sync.yaml'
-    with open(config_file, 'w') as f:
-        yaml.dump(existing_config, f)
+    write_yaml(config_file, existing_config)
     
     # Mock Trello API
     mock_boards = [
         {'id': 'new_board', 'name': 'New Board'},
     ]
     
-    mock_board_details = {
-        'new_board': {
-            'id': 'new_board',
-            'name': 'New Board',
-            'organization': None,
-        },
-    }
+    mock_trello.get_boards.return_value = mock_boards
+    mock_trello.get_board.return_value = BOARD_DETAILS['new_board']
+    
+    assert config_init_impl(force=True) == config_file
+    output = capsys.readouterr().out
+    assert 'Creating new configuration file' in output
     
-    with patch('trello_sync.cli.commands.TrelloSync') as mock_sync_class:
-        mock_sync = MagicMock()
-        mock_sync.get_boards.return_value = mock_boards
-        mock_sync.get_board.return_value = mock_board_details['new_board']
-        mock_sync_class.return_value = mock_sync
-        
-        runner = CliRunner()
-        result = runner.invoke(cli, ['config-init', '--force'])
-        
-        assert result.exit_code == 0
-        assert 'Creating new configuration file' in result.output
-        
-        # Check old board was removed
-        with open(config_file, 'r') as f:
-            config = yaml.safe_load(f)
-        
-        assert len(config['boards']) == 1
-        assert config['boards'][0]['board_id'] == 'new_board'
+    # Check old board was removed
+    config = read_yaml(config_file)
+    
+    assert len(config['boards']) == 1
+    assert config['boards'][0]['board_id'] == 'new_board'
 
 
-def test_config_init_preserves_custom_settings(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+def test_config_init_preserves_custom_settings(
+    mock_trello: MagicMock, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
     """Test config-init preserves custom settings like assets_folder."""
     monkeypatch.chdir(tmp_path)
     
@@ -238,8 +249,7 @@ def test_config_init_preserves_custom_settings(tmp_path: Path, monkeypatch: pyte
     }
     
     config_file = tmp_path / 'trello-sync.yaml'
-    with open(config_file, 'w') as f:
-        yaml.dump(existing_config, f)
+    write_yaml(config_file, existing_config)
     
     # Mock Trello API
     mock_boards = [
@@ -254,23 +264,16 @@ def test_config_init_preserves_custom_settings(tmp_path: Path, monkeypatch: pyte
         },
     }
     
-    with patch('trello_sync.cli.commands.TrelloSync') as mock_sync_class:
-        mock_sync = MagicMock()
-        mock_sync.get_boards.return_value = mock_boards
-        mock_sync.get_board.return_value = mock_board_details['board1']
-        mock_sync_class.return_value = mock_sync
-        
-        runner = CliRunner()
-        result = runner.invoke(cli, ['config-init'])
-        
-        assert result.exit_code == 0
-        
-        # Check custom settings were preserved
-        with open(config_file, 'r') as f:
-            config = yaml.safe_load(f)
-        
-        board1 = config['boards'][0]
-        assert board1['enabled'] is True
-        assert board1['target_path'] == 'custom/path/{org}/{board}/{column}/{card}.md'
-        assert board1['assets_folder'] == 'custom/assets/{org}/{board}'
+    mock_trello.get_boards.return_value = mock_boards
+    mock_trello.get_board.return_value = mock_board_details['board1']
+    
+    assert config_init_impl(force=False) == config_file
+    
+    # Check custom settings were preserved
+    config = read_yaml(config_file)
+    
+    board1 = config['boards'][0]
+    assert board1['enabled'] is True
+    assert board1['target_path'] == 'custom/path/{org}/{board}/{column}/{card}.md'
+    assert board1['assets_folder'] == 'custom/assets/{org}/{board}'
 
@@ -6,28 +6,51 @@ from trello_sync.utils.formatting import (
     format_bytes,
     format_date,
     format_iso_date,
+    parse_iso_timestamp,
     sanitize_file_name,
 )
 
 
-def test_sanitize_file_name() -> None:
+@pytest.mark.parametrize(
+    ("name", "expected"),
+    [
+        ("Test Card Name", "test-card-name"),
+        ("Test@Card#Name!", "testcardname"),
+        ("Test  Card   Name", "test-card-name"),
+        ("", "untitled"),
+        (None, "untitled"),
+        ("   ", "untitled"),
+        pytest.param("a" * 150, "a" * 100, id="truncated"),
+        ("snake_case -- Café", "snakecase-café"),
+    ],
+)
+def test_sanitize_file_name(name: str | None, expected: str) -> None:
     """Test sanitize_file_name function."""
-    assert sanitize_file_name("Test Card Name") == "test-card-name"
-    assert sanitize_file_name("Test@Card#Name!") == "testcardname"
-    assert sanitize_file_name("Test  Card   Name") == "test-card-name"
-    assert sanitize_file_name("") == "untitled"
-    assert sanitize_file_name(None) == "untitled"
-    assert sanitize_file_name("   ") == "untitled"
-    assert sanitize_file_name("a" * 150) == "a" * 100
+    assert sanitize_file_name(name) == expected
 
 
-def test_format_iso_date() -> None:
+@pytest.mark.parametrize(
+    ("date_str", "expected"),
+    [
+        ("2024-01-20T12:00:00Z", "2024-01-20T12:00:00Z"),
+        ("2024-01-20T12:00:00+00:00", "2024-01-20T12:00:00Z"),
+        (None, None),
+        ("", None),
+        ("invalid", "invalid"),
+    ],
+)
+def test_format_iso_date(date_str: str | None, expected: str | None) -> None:
     """Test format_iso_date function."""
-    assert format_iso_date("2024-01-20T12:00:00Z") == "2024-01-20T12:00:00Z"
-    assert format_iso_date("2024-01-20T12:00:00+00:00") == "2024-01-20T12:00:00Z"
-    assert format_iso_date(None) is None
-    assert format_iso_date("") is None
-    assert format_iso_date("invalid") == "invalid"
+    assert format_iso_date(date_str) == expected
+
+
+def test_parse_iso_timestamp() -> None:
+    """Test parse_iso_timestamp function."""
+    assert parse_iso_timestamp("2024-01-20T12:00:00.000Z") == 1705752000.0
+    assert parse_iso_timestamp("2024-01-20T12:00:00+00:00") == 1705752000.0
+    assert parse_iso_timestamp("2024-01-20T12:00:00") == 1705752000.0
+    with pytest.raises(ValueError):
+        parse_iso_timestamp("invalid")
 
 
 def test_format_date() -> None:
@@ -39,12 +62,21 @@ def test_format_date() -> None:
     assert format_date("invalid") == "invalid"
 
 
-def test_format_bytes() -> None:
+@pytest.mark.parametrize(
+    ("size", "expected"),
+    [
+        (0, ""),
+        (None, ""),
+        (512, "512.0 Bytes"),
+        (1024, "1.0 KB"),
+        (1048576, "1.0 MB"),
+        (1073741824, "1.0 GB"),
+        (1023, "1023.0 Bytes"),
+        (3 * 1024 ** 4, "3.0 TB"),
+        (2048 * 1024 ** 4, "2048.0 TB"),
+    ],
+)
+def test_format_bytes(size: int | None, expected: str) -> None:
     """Test format_bytes function."""
-    assert format_bytes(0) == ""
-    assert format_bytes(None) == ""
-    assert format_bytes(512) == "512.0 Bytes"
-    assert format_bytes(1024) == "1.0 KB"
-    assert format_bytes(1048576) == "1.0 MB"
-    assert format_bytes(1073741824) == "1.0 GB"
+    assert format_bytes(size) == expected
 
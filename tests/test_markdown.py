@@ -1,22 +1,19 @@
 """Tests for markdown generation utilities."""
 
+from typing import Any
+from unittest.mock import ANY
+
+import pytest
+
+from tests.helpers import parse_frontmatter
 from trello_sync.utils.markdown import generate_markdown
 
 
-def test_generate_markdown_basic() -> None:
+def test_generate_markdown_basic(base_card_data: dict[str, Any]) -> None:
     """Test basic markdown generation."""
     card_data = {
-        'id': 'test123',
-        'name': 'Test Card',
-        'url': 'https://trello.com/c/test123',
+        **base_card_data,
         'desc': 'Test description',
-        'dateCreated': '2024-01-20T12:00:00Z',
-        'dateLastActivity': '2024-01-21T12:00:00Z',
-        'labels': [],
-        'members': [],
-        'attachments': [],
-        'comments': [],
-        'checklists': [],
     }
     
     result = generate_markdown(card_data, 'Test List', 'Test Board', 'Test Workspace')
@@ -24,177 +21,119 @@ def test_generate_markdown_basic() -> None:
     assert '# Test Card' in result
     assert '## Description' in result
     assert 'Test description' in result
-    assert 'trello_board_card_id: "test123"' in result
-    assert 'board: "Test Board"' in result
+    frontmatter = parse_frontmatter(result)
+    assert frontmatter['trello_board_card_id'] == 'test123'
+    assert frontmatter['board'] == 'Test Board'
 
 
-def test_generate_markdown_with_checklist() -> None:
-    """Test markdown generation with checklist."""
-    card_data = {
-        'id': 'test123',
-        'name': 'Test Card',
-        'url': 'https://trello.com/c/test123',
-        'desc': '',
-        'dateCreated': '2024-01-20T12:00:00Z',
-        'dateLastActivity': '2024-01-21T12:00:00Z',
-        'labels': [],
-        'members': [],
-        'attachments': [],
-        'comments': [],
-        'checklists': [
+@pytest.mark.parametrize(
+    ('card_overrides', 'markdown_kwargs', 'expected_substrings', 'expected_frontmatter'),
+    [
+        pytest.param(
             {
-                'id': 'checklist_id_123',
-                'name': 'Test Checklist',
-                'checkItems': [
-                    {'id': 'checkitem_id_1', 'name': 'Item 1', 'state': 'complete'},
-                    {'id': 'checkitem_id_2', 'name': 'Item 2', 'state': 'incomplete'},
+                'checklists': [
+                    {
+                        'id': 'checklist_id_123',
+                        'name': 'Test Checklist',
+                        'checkItems': [
+                            {'id': 'checkitem_id_1', 'name': 'Item 1', 'state': 'complete'},
+                            {'id': 'checkitem_id_2', 'name': 'Item 2', 'state': 'incomplete'},
+                        ],
+                    },
                 ],
             },
-        ],
-    }
-    
-    result = generate_markdown(card_data, 'Test List', 'Test Board', 'Test Workspace')
-    
-    assert '## Checklist: Test Checklist' in result
-    assert '- [x] Item 1' in result
-    assert '- [ ] Item 2' in result
-    # Verify new frontmatter fields
-    assert 'trello_checklist_ids:' in result
-    assert '"Test Checklist": "checklist_id_123"' in result
-    assert 'trello_checkitem_ids:' in result
-    assert '"Item 1": "checkitem_id_1"' in result
-    assert '"Item 2": "checkitem_id_2"' in result
-    assert 'sync_status:' in result
-    assert 'synced' in result
-
-
-def test_generate_markdown_with_attachments() -> None:
-    """Test markdown generation with attachments."""
-    card_data = {
-        'id': 'test123',
-        'name': 'Test Card',
-        'url': 'https://trello.com/c/test123',
-        'desc': '',
-        'dateCreated': '2024-01-20T12:00:00Z',
-        'dateLastActivity': '2024-01-21T12:00:00Z',
-        'labels': [],
-        'members': [],
-        'attachments': [
-            {'name': 'file.pdf', 'url': 'https://example.com/file.pdf', 'isUpload': True, 'bytes': 1024},
-            {'name': 'Link', 'url': 'https://example.com', 'isUpload': False},
-        ],
-        'comments': [],
-        'checklists': [],
-    }
-    
-    result = generate_markdown(card_data, 'Test List', 'Test Board', 'Test Workspace')
-    
-    assert '## Attachments' in result
-    assert '### Files' in result
-    assert '### Links' in result
-    assert '[file.pdf]' in result
-    assert '[Link]' in result
-
-
-def test_generate_markdown_with_comments() -> None:
-    """Test markdown generation with comments and comment IDs."""
-    card_data = {
-        'id': 'test123',
-        'name': 'Test Card',
-        'url': 'https://trello.com/c/test123',
-        'desc': '',
-        'dateCreated': '2024-01-20T12:00:00Z',
-        'dateLastActivity': '2024-01-21T12:00:00Z',
-        'labels': [],
-        'members': [],
-        'attachments': [],
-        'comments': [
+            {},
+            ['## Checklist: Test Checklist', '- [x] Item 1', '- [ ] Item 2'],
             {
-                'id': 'comment_id_123',
-                'type': 'commentCard',
-                'date': '2024-01-21T10:00:00Z',
-                'memberCreator': {'fullName': 'Test User', 'username': 'testuser'},
-                'data': {'text': 'This is a test comment'},
+                'trello_checklist_ids': {'Test Checklist': 'checklist_id_123'},
+                'trello_checkitem_ids': {
+                    'Test Checklist': {'Item 1': 'checkitem_id_1', 'Item 2': 'checkitem_id_2'},
+                },
+                'sync_status': 'synced',
             },
-        ],
-        'checklists': [],
-    }
-    
-    result = generate_markdown(card_data, 'Test List', 'Test Board', 'Test Workspace')
-    
-    assert '## Comments' in result
-    assert '#### Comment by Test User' in result
-    assert 'This is a test comment' in result
-    # Verify comment IDs in frontmatter
-    assert 'trello_comment_ids:' in result
-    assert 'id: "comment_id_123"' in result
-    assert 'author: "Test User"' in result
-
-
-def test_generate_markdown_with_list_and_board_ids() -> None:
-    """Test markdown generation with list and board IDs."""
-    card_data = {
-        'id': 'test123',
-        'name': 'Test Card',
-        'url': 'https://trello.com/c/test123',
-        'desc': '',
-        'dateCreated': '2024-01-20T12:00:00Z',
-        'dateLastActivity': '2024-01-21T12:00:00Z',
-        'labels': [],
-        'members': [],
-        'attachments': [],
-        'comments': [],
-        'checklists': [],
-    }
+            id='checklist',
+        ),
+        pytest.param(
+            {
+                'attachments': [
+                    {'name': 'file.pdf', 'url': 'https://example.com/file.pdf', 'isUpload': True, 'bytes': 1024},
+                    {'name': 'Link', 'url': 'https://example.com', 'isUpload': False},
+                ],
+            },
+            {},
+            ['## Attachments', '### Files', '### Links', '[file.pdf]', '[Link]'],
+            {'attachments-count': 2},
+            id='attachments',
+        ),
+        pytest.param(
+            {
+                'comments': [
+                    {
+                        'id': 'comment_id_123',
+                        'type': 'commentCard',
+                        'date': '2024-01-21T10:00:00Z',
+                        'memberCreator': {'fullName': 'Test User', 'username': 'testuser'},
+                        'data': {'text': 'This is a test comment'},
+                    },
+                ],
+            },
+            {},
+            ['## Comments', '#### Comment by Test User', 'This is a test comment'],
+            {
+                'comments-count': 1,
+                'trello_comment_ids': [
+                    {
+                        'id': 'comment_id_123',
+                        'author': 'Test User',
+                        'date': '2024-01-21T10:00:00Z',
+                        'content_hash': ANY,
+                    },
+                ],
+            },
+            id='comments',
+        ),
+        pytest.param(
+            {},
+            {'list_id': 'list_id_123', 'board_id': 'board_id_456'},
+            [],
+            {'trello_list_id': 'list_id_123', 'trello_board_id': 'board_id_456'},
+            id='list_and_board_ids',
+        ),
+    ],
+)
+def test_generate_markdown_sections(
+    base_card_data: dict[str, Any],
+    card_overrides: dict[str, Any],
+    markdown_kwargs: dict[str, str],
+    expected_substrings: list[str],
+    expected_frontmatter: dict[str, Any],
+) -> None:
+    """Test each optional card section and ID field is rendered."""
+    card_data = {**base_card_data, **card_overrides}
     
-    result = generate_markdown(
-        card_data,
-        'Test List',
-        'Test Board',
-        'Test Workspace',
-        list_id='list_id_123',
-        board_id='board_id_456'
-    )
+    result = generate_markdown(card_data, 'Test List', 'Test Board', 'Test Workspace', **markdown_kwargs)
     
-    assert 'trello_list_id: "list_id_123"' in result
-    assert 'trello_board_id: "board_id_456"' in result
+    missing = [fragment for fragment in expected_substrings if fragment not in result]
+    assert not missing, missing
+    frontmatter = parse_frontmatter(result)
+    assert {key: frontmatter.get(key) for key in expected_frontmatter} == expected_frontmatter
 
 
-def test_generate_markdown_sync_status_fields() -> None:
+def test_generate_markdown_sync_status_fields(base_card_data: dict[str, Any]) -> None:
     """Test that sync status fields are included in frontmatter."""
-    card_data = {
-        'id': 'test123',
-        'name': 'Test Card',
-        'url': 'https://trello.com/c/test123',
-        'desc': '',
-        'dateCreated': '2024-01-20T12:00:00Z',
-        'dateLastActivity': '2024-01-21T12:00:00Z',
-        'labels': [],
-        'members': [],
-        'attachments': [],
-        'comments': [],
-        'checklists': [],
-    }
-    
-    result = generate_markdown(card_data, 'Test List', 'Test Board', 'Test Workspace')
+    result = generate_markdown(base_card_data, 'Test List', 'Test Board', 'Test Workspace')
     
     # Verify sync status fields are present
-    assert 'sync_status:' in result
-    assert 'synced' in result
+    assert parse_frontmatter(result)['sync_status'] == 'synced'
     # last_synced should not be present (None values are filtered out)
 
 
-def test_generate_markdown_trello_ui_metadata() -> None:
+def test_generate_markdown_trello_ui_metadata(base_card_data: dict[str, Any]) -> None:
     """Test that Trello UI metadata fields are included in frontmatter."""
     card_data = {
-        'id': 'test123',
-        'name': 'Test Card',
-        'url': 'https://trello.com/c/test123',
+        **base_card_data,
         'shortUrl': 'https://trello.com/c/abc123',
         'idShort': 1621,
-        'desc': '',
-        'dateCreated': '2024-01-20T12:00:00Z',
-        'dateLastActivity': '2024-01-21T12:00:00Z',
         'subscribed': True,
         'closed': False,
         'due': '2024-01-25T12:00:00Z',
@@ -215,42 +154,115 @@ def test_generate_markdown_trello_ui_metadata() -> None:
             {'fullName': 'John Doe', 'username': 'johndoe', 'id': 'member_id_1', 'initials': 'JD'},
             {'fullName': 'Jane Smith', 'username': 'janesmith', 'id': 'member_id_2'},
         ],
-        'attachments': [],
-        'comments': [],
-        'checklists': [],
     }
     
     result = generate_markdown(card_data, 'Test List', 'Test Board', 'Test Workspace')
     
+    frontmatter = parse_frontmatter(result)
+    
     # Verify new metadata fields
-    assert 'subscribed: true' in result
-    assert 'closed: false' in result
-    assert 'idShort: 1621' in result
-    assert 'shortUrl:' in result
-    assert 'dueComplete: false' in result
-    assert 'start:' in result
-    assert 'pos: 16384' in result
+    assert frontmatter['subscribed'] is True
+    assert frontmatter['closed'] is False
+    assert frontmatter['idShort'] == 1621
+    assert frontmatter['shortUrl'] == 'https://trello.com/c/abc123'
+    assert frontmatter['dueComplete'] is False
+    assert frontmatter['start'] == '2024-01-22T12:00:00Z'
+    assert frontmatter['pos'] == 16384
     
     # Verify enhanced labels with colors
-    assert 'labels:' in result
-    assert 'name: "Important"' in result
-    assert 'color: "red"' in result
-    assert 'name: "Bug"' in result
-    assert 'color: "orange"' in result
-    assert 'name: "No Color Label"' in result
+    assert frontmatter['labels'] == [
+        {'name': 'Important', 'color': 'red', 'id': 'label_id_1'},
+        {'name': 'Bug', 'color': 'orange', 'id': 'label_id_2'},
+        {'name': 'No Color Label', 'id': 'label_id_3'},
+    ]
     
     # Verify enhanced members (assigned to)
-    assert 'members:' in result
-    assert 'fullName: "John Doe"' in result
-    assert 'username: "johndoe"' in result
-    assert 'id: "member_id_1"' in result
-    assert 'initials: "JD"' in result
-    assert 'fullName: "Jane Smith"' in result
-    assert 'username: "janesmith"' in result
+    assert frontmatter['members'] == [
+        {'fullName': 'John Doe', 'username': 'johndoe', 'id': 'member_id_1', 'initials': 'JD'},
+        {'fullName': 'Jane Smith', 'username': 'janesmith', 'id': 'member_id_2'},
+    ]
     
     # Verify cover information
-    assert 'cover:' in result
-    assert 'color: "blue"' in result
-    assert 'brightness: "light"' in result
-    assert 'size: "normal"' in result
+    assert frontmatter['cover'] == {'color': 'blue', 'brightness': 'light', 'size': 'normal'}
 
+
+def test_generate_markdown_escapes_frontmatter_strings() -> None:
+    """Test quotes, backslashes and newlines are escaped in frontmatter strings."""
+    card_data = {
+        'id': 'test123',
+        'name': 'Test Card',
+        'labels': [{'name': 'C:\\temp "new"'}],
+    }
+    
+    result = generate_markdown(card_data, 'Line 1\nLine 2', 'Board \\ "One"', 'Test Workspace')
+    
+    assert 'board: "Board \\\\ \\"One\\""' in result
+    assert 'list: "Line 1\\nLine 2"' in result
+    assert 'name: "C:\\\\temp \\"new\\""' in result
+
+
+def test_generate_markdown_frontmatter_is_valid_yaml() -> None:
+    """Test the hand-written frontmatter parses back to the original values."""
+    card_data = {
+        'id': 'test123',
+        'name': 'Test Card',
+        'url': 'https://trello.com/c/test123',
+        'subscribed': True,
+        'closed': False,
+        'idShort': 7,
+        'pos': 16384.5,
+        'labels': [{'name': 'Needs: "review"', 'color': 'red'}],
+        'checklists': [
+            {'id': 'cl1', 'name': 'Launch \\ prep', 'checkItems': [{'id': 'ci1', 'name': 'Ship it'}]},
+        ],
+    }
+    
+    result = generate_markdown(card_data, 'To Do', 'Board\nName', 'Workspace')
+    frontmatter = parse_frontmatter(result)
+    
+    assert frontmatter['board'] == 'Board\nName'
+    assert frontmatter['subscribed'] is True
+    assert frontmatter['closed'] is False
+    assert frontmatter['idShort'] == 7
+    assert frontmatter['pos'] == 16384.5
+    assert frontmatter['labels'] == [{'name': 'Needs: "review"', 'color': 'red'}]
+    assert frontmatter['trello_checklist_ids'] == {'Launch \\ prep': 'cl1'}
+    assert frontmatter['trello_checkitem_ids'] == {'Launch \\ prep': {'Ship it': 'ci1'}}
+
+
+def test_generate_markdown_null_collections() -> None:
+    """Test collections sent as null are treated as empty."""
+    card_data = {
+        'id': 'test123',
+        'name': 'Test Card',
+        'labels': None,
+        'members': None,
+        'checklists': None,
+        'attachments': None,
+        'comments': None,
+        'actions': None,
+    }
+    
+    result = generate_markdown(card_data, 'To Do', 'Board', 'Workspace')
+    
+    assert 'attachments-count: 0' in result
+    assert '## Attachments' not in result
+    assert '## Comments' not in result
+
+
+def test_generate_markdown_skips_checklists_without_item_ids() -> None:
+    """Test checklists whose items lack IDs get no trello_checkitem_ids entry."""
+    card_data = {
+        'id': 'test123',
+        'name': 'Test Card',
+        'checklists': [
+            {'id': 'cl1', 'name': 'Tracked', 'checkItems': [{'id': 'ci1', 'name': 'Step'}]},
+            {'id': 'cl2', 'name': 'Untracked', 'checkItems': [{'name': 'No ID'}]},
+        ],
+    }
+    
+    result = generate_markdown(card_data, 'To Do', 'Board', 'Workspace')
+    frontmatter = parse_frontmatter(result)
+    
+    assert frontmatter['trello_checkitem_ids'] == {'Tracked': {'Step': 'ci1'}}
+    assert '- [ ] No ID' in result
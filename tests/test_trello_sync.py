@@ -1,134 +1,479 @@
 """Tests for TrelloSync service."""
 
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
 from typing import TYPE_CHECKING
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 import pytest
+import requests
 
 if TYPE_CHECKING:
     from _pytest.monkeypatch import MonkeyPatch
     from pytest_mock.plugin import MockerFixture
 
-from trello_sync.services.trello_sync import TrelloSync, get_credentials
+from trello_sync.services.attachments import download_attachment
+from trello_sync.services.trello_sync import NOT_MODIFIED, TrelloSync, get_credentials
 
 
-def test_get_credentials_success(monkeypatch: "MonkeyPatch") -> None:
-    """Test successful credential retrieval."""
-    monkeypatch.setenv('TRELLO_API_KEY', 'test_key')
-    monkeypatch.setenv('TRELLO_TOKEN', 'test_token')
-    
-    api_key, token = get_credentials()
-    assert api_key == 'test_key'
-    assert token == 'test_token'
-
-
-def test_get_credentials_missing_key(monkeypatch: "MonkeyPatch") -> None:
-    """Test credential retrieval with missing API key."""
-    monkeypatch.delenv('TRELLO_API_KEY', raising=False)
-    monkeypatch.setenv('TRELLO_TOKEN', 'test_token')
-    
-    with pytest.raises(ValueError, match="TRELLO_API_KEY"):
-        get_credentials()
+@pytest.fixture(autouse=True)
+def stub_credentials(monkeypatch: "MonkeyPatch") -> None:
+    """Give TrelloSync fixed credentials instead of reading the environment."""
+    monkeypatch.setattr(
+        'trello_sync.services.trello_sync.get_credentials', lambda: ('test_key', 'test_token')
+    )
 
 
-def test_get_credentials_missing_token(monkeypatch: "MonkeyPatch") -> None:
-    """Test credential retrieval with missing token."""
-    monkeypatch.setenv('TRELLO_API_KEY', 'test_key')
-    monkeypatch.delenv('TRELLO_TOKEN', raising=False)
-    monkeypatch.delenv('TRELLO_API_TOKEN', raising=False)
-    
-    with pytest.raises(ValueError, match="TRELLO_TOKEN"):
-        get_credentials()
+@pytest.fixture
+def sync() -> TrelloSync:
+    """TrelloSync client built with the stubbed credentials."""
+    return TrelloSync()
 
 
-def test_get_credentials_uses_api_token(monkeypatch: "MonkeyPatch") -> None:
-    """Test credential retrieval uses TRELLO_API_TOKEN as fallback."""
-    monkeypatch.setenv('TRELLO_API_KEY', 'test_key')
-    monkeypatch.delenv('TRELLO_TOKEN', raising=False)
-    monkeypatch.setenv('TRELLO_API_TOKEN', 'test_api_token')
+@pytest.mark.parametrize(
+    ('env', 'expected', 'error'),
+    [
+        pytest.param(
+            {'TRELLO_API_KEY': 'test_key', 'TRELLO_TOKEN': 'test_token'},
+            ('test_key', 'test_token'),
+            None,
+            id='success',
+        ),
+        pytest.param(
+            {'TRELLO_API_KEY': None, 'TRELLO_TOKEN': 'test_token'},
+            None,
+            'TRELLO_API_KEY',
+            id='missing_key',
+        ),
+        pytest.param(
+            {'TRELLO_API_KEY': 'test_key', 'TRELLO_TOKEN': None, 'TRELLO_API_TOKEN': None},
+            None,
+            'TRELLO_TOKEN',
+            id='missing_token',
+        ),
+        pytest.param(
+            {'TRELLO_API_KEY': 'test_key', 'TRELLO_TOKEN': None, 'TRELLO_API_TOKEN': 'test_api_token'},
+            ('test_key', 'test_api_token'),
+            None,
+            id='api_token_fallback',
+        ),
+    ],
+)
+def test_get_credentials(
+    monkeypatch: "MonkeyPatch",
+    env: dict[str, str | None],
+    expected: tuple[str, str] | None,
+    error: str | None,
+) -> None:
+    """Test credential retrieval from the environment; None values are unset."""
+    for name, value in env.items():
+        if value is None:
+            monkeypatch.delenv(name, raising=False)
+        else:
+            monkeypatch.setenv(name, value)
     
-    api_key, token = get_credentials()
-    assert api_key == 'test_key'
-    assert token == 'test_api_token'
+    if error is not None:
+        with pytest.raises(ValueError, match=error):
+            get_credentials()
+    else:
+        assert get_credentials() == expected
 
 
-@patch('trello_sync.services.trello_sync.get_credentials')
-def test_trello_sync_init(mock_get_creds: MagicMock) -> None:
+def test_trello_sync_init(sync: TrelloSync) -> None:
     """Test TrelloSync initialization."""
-    mock_get_creds.return_value = ('test_key', 'test_token')
-    
-    sync = TrelloSync()
-    
     assert sync.api_key == 'test_key'
     assert sync.token == 'test_token'
     assert sync.base_url == 'https://api.trello.com/1'
 
 
-@patch('trello_sync.services.trello_sync.get_credentials')
-def test_trello_sync_request(mock_get_creds: MagicMock, mocker: "MockerFixture") -> None:
+class _FakeResponse:
+    """Minimal stand-in for requests.Response carrying a JSON body."""
+
+    def __init__(self, content: bytes, status_code: int = 200) -> None:
+        self.content = content
+        self.status_code = status_code
+        self.headers: dict[str, str] = {}
+
+    def json(self) -> object:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        pass
+
+
+class _FakeSession:
+    """Minimal stand-in for requests.Session that records each request."""
+
+    def __init__(self, response: _FakeResponse) -> None:
+        self.response = response
+        self.calls: list[tuple[str, str, dict]] = []
+
+    def mount(self, prefix: str, adapter: object) -> None:
+        pass
+
+    def request(self, method: str, url: str, **kwargs: object) -> _FakeResponse:
+        self.calls.append((method, url, kwargs))
+        return self.response
+
+
+def test_trello_sync_request(mocker: "MockerFixture") -> None:
     """Test TrelloSync API request."""
-    mock_get_creds.return_value = ('test_key', 'test_token')
-    mock_response = MagicMock()
-    mock_response.json.return_value = {'id': '123', 'name': 'Test'}
-    mock_response.raise_for_status = MagicMock()
+    session = _FakeSession(_FakeResponse(b'{"id": "123", "name": "Test"}'))
+    mocker.patch('trello_sync.services.trello_sync.requests.Session', return_value=session)
+    
+    sync = TrelloSync()
+    result = sync._request('GET', 'test/endpoint', {'param': 'value'})
+    
+    assert result == {'id': '123', 'name': 'Test'}
+    assert len(session.calls) == 1
+    method, url, kwargs = session.calls[-1]
+    assert method == 'GET'
+    assert url == 'https://api.trello.com/1/test/endpoint'
+    assert kwargs['params'] == {'key': 'test_key', 'token': 'test_token', 'param': 'value'}
+    assert kwargs['timeout'] == (5, 30)
+
+
+def test_session_does_not_add_auth_to_downloads(
+    sync: TrelloSync, monkeypatch: "MonkeyPatch", tmp_path: Path
+) -> None:
+    """Test attachment downloads through the shared session keep their URL as-is."""
+    sent_urls = []
+    
+    def fake_send(prepared: requests.PreparedRequest, **kwargs: object) -> MagicMock:
+        sent_urls.append(prepared.url)
+        response = MagicMock()
+        response.iter_content.return_value = [b'file content']
+        return response
+    
+    monkeypatch.setattr(sync.session, 'send', fake_send)
+    url = 'https://trello.com/attachments/test.jpg?key=A&token=B'
+    attachment_data = {'id': 'att1', 'name': 'test.jpg', 'url': url}
+    
+    download_attachment(
+        attachment_data, tmp_path / 'test.jpg', 'test_key', 'test_token', session=sync.session
+    )
+    
+    assert sent_urls == [url]
+
+
+@pytest.fixture(scope='module')
+def card_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Directory shared by the should_sync_card cases; each uses its own file name."""
+    return tmp_path_factory.mktemp('cards')
+
+
+@pytest.mark.parametrize(
+    ('file_mtime', 'card_updated', 'expected'),
+    [
+        pytest.param(None, "2024-01-20T12:00:00Z", True, id='new_file'),
+        pytest.param(
+            datetime(2020, 1, 1, 12, tzinfo=timezone.utc).timestamp(),
+            "2025-01-20T12:00:00Z",
+            True,
+            id='older_file',
+        ),
+        pytest.param(
+            datetime(2024, 1, 1, 12, tzinfo=timezone.utc).timestamp(),
+            "2020-01-20T12:00:00Z",
+            False,
+            id='newer_file',
+        ),
+    ],
+)
+def test_should_sync_card(
+    sync: TrelloSync,
+    card_dir: Path,
+    request: pytest.FixtureRequest,
+    file_mtime: float | None,
+    card_updated: str,
+    expected: bool,
+) -> None:
+    """Test should_sync_card against missing, older and newer local files."""
+    card_path = card_dir / f"card_{request.node.callspec.id}.md"
+    if file_mtime is not None:
+        card_path.write_bytes(b"content")
+        os.utime(card_path, (file_mtime, file_mtime))
+    
+    assert sync.should_sync_card(card_path, card_updated) is expected
+
+
+def test_trello_sync_request_conditional(mocker: "MockerFixture") -> None:
+    """Test conditional requests reuse the cached response on 304 Not Modified."""
+    fresh_response = MagicMock(status_code=200, headers={'ETag': '"abc"'}, content=b'{"id": "123"}')
+    fresh_response.json.return_value = {'id': '123'}
+    not_modified_response = MagicMock(status_code=304, headers={})
     
     mock_session = mocker.patch('trello_sync.services.trello_sync.requests.Session')
     mock_session_instance = MagicMock()
-    mock_session_instance.request.return_value = mock_response
+    mock_session_instance.request.side_effect = [fresh_response, not_modified_response]
     mock_session.return_value = mock_session_instance
     
-    sync = TrelloSync()
-    result = sync._request('GET', 'test/endpoint', {'param': 'value'})
+    sync = TrelloSync(conditional=True)
+    assert sync._request('GET', 'cards/123') == {'id': '123'}
+    assert sync._request('GET', 'cards/123') == {'id': '123'}
     
-    assert result == {'id': '123', 'name': 'Test'}
-    mock_session_instance.request.assert_called_once()
-    call_args = mock_session_instance.request.call_args
-    assert call_args[0][0] == 'GET'
-    assert 'key' in call_args[1]['params']
-    assert 'token' in call_args[1]['params']
+    second_call = mock_session_instance.request.call_args_list[1]
+    assert second_call[1]['headers'] == {'If-None-Match': '"abc"'}
+    not_modified_response.raise_for_status.assert_not_called()
+    
+    mock_session_instance.request.side_effect = [not_modified_response]
+    assert sync._request('GET', 'cards/123', use_cached=False) is NOT_MODIFIED
 
 
-@patch('trello_sync.services.trello_sync.get_credentials')
-def test_should_sync_card_new_file(mock_get_creds: MagicMock, tmp_path: "pytest.TempPathFactory") -> None:
-    """Test should_sync_card for new file."""
-    mock_get_creds.return_value = ('test_key', 'test_token')
+def test_etag_cache_saves_only_entries_used_since_load(
+    mocker: "MockerFixture", tmp_path: Path
+) -> None:
+    """Test the saved ETag cache drops unused entries and keeps card bodies out."""
+    cache_path = tmp_path / 'etags' / 'board1.json'
+    cache_path.parent.mkdir()
+    cache_path.write_text(json.dumps({
+        'cards/deleted': {'etag': '"old"'},
+        'boards/board1': {'etag': '"b1"', 'data': {'id': 'board1'}},
+    }), encoding='utf-8')
+    card_response = _FakeResponse(b'{"id": "card1"}')
+    card_response.headers = {'ETag': '"c1"'}
+    session = _FakeSession(_FakeResponse(b'', status_code=304))
+    mocker.patch('trello_sync.services.trello_sync.requests.Session', return_value=session)
     
-    sync = TrelloSync()
-    card_path = tmp_path / "nonexistent.md"
+    sync = TrelloSync(conditional=True)
+    sync.load_etag_cache(cache_path)
+    assert sync._request('GET', 'boards/board1') == {'id': 'board1'}
+    session.response = card_response
+    assert sync._request('GET', 'cards/card1', use_cached=False) == {'id': 'card1'}
+    sync.save_etag_cache(cache_path)
     
-    assert sync.should_sync_card(card_path, "2024-01-20T12:00:00Z") is True
+    assert json.loads(cache_path.read_text(encoding='utf-8')) == {
+        'boards/board1': {'etag': '"b1"', 'data': {'id': 'board1'}},
+        'cards/card1': {'etag': '"c1"'},
+    }
 
 
-@patch('trello_sync.services.trello_sync.get_credentials')
-def test_should_sync_card_older_file(mock_get_creds: MagicMock, tmp_path: "pytest.TempPathFactory") -> None:
-    """Test should_sync_card for older file."""
-    from datetime import datetime
+def test_get_board_leaves_cached_response_unchanged(mocker: "MockerFixture") -> None:
+    """Test the organization is added to a copy, not the cached board response."""
+    response = _FakeResponse(b'{"id": "board1", "idOrganization": "org1"}')
+    response.headers = {'ETag': '"b1"'}
+    session = _FakeSession(response)
+    mocker.patch('trello_sync.services.trello_sync.requests.Session', return_value=session)
     
-    mock_get_creds.return_value = ('test_key', 'test_token')
+    sync = TrelloSync(conditional=True)
+    board = sync.get_board('board1')
     
-    sync = TrelloSync()
-    card_path = tmp_path / "existing.md"
-    card_path.write_text("content")
+    assert 'organization' in board
+    assert sync._etag_cache['boards/board1']['data'] == {
+        'id': 'board1',
+        'idOrganization': 'org1',
+    }
+
+
+def test_load_etag_cache_skips_malformed_entries(sync: TrelloSync, tmp_path: Path) -> None:
+    """Test entries without a string ETag are ignored when loading the cache."""
+    cache_path = tmp_path / 'board1.json'
+    cache_path.write_text(json.dumps({
+        'good': {'etag': '"abc"', 'data': [1]},
+        'missing_etag': {'data': [2]},
+        'wrong_type': ['"abc"'],
+        'numeric_etag': {'etag': 5},
+    }), encoding='utf-8')
     
-    # Set file modification time to be older than card update
-    old_time = datetime(2020, 1, 1, 12, 0, 0).timestamp()
-    card_path.touch()
-    import os
-    os.utime(card_path, (old_time, old_time))
+    sync.load_etag_cache(cache_path)
     
-    # File is older than card update (2025 is in the future)
-    assert sync.should_sync_card(card_path, "2025-01-20T12:00:00Z") is True
+    assert sync._etag_cache == {'good': {'etag': '"abc"', 'data': [1]}}
 
 
-@patch('trello_sync.services.trello_sync.get_credentials')
-def test_should_sync_card_newer_file(mock_get_creds: MagicMock, tmp_path: "pytest.TempPathFactory") -> None:
-    """Test should_sync_card for newer file."""
-    mock_get_creds.return_value = ('test_key', 'test_token')
+def test_write_file_atomic(tmp_path: Path) -> None:
+    """Test atomic file write replaces content and leaves no temp file."""
+    from trello_sync.services.trello_sync import _write_file_atomic
     
-    sync = TrelloSync()
-    card_path = tmp_path / "existing.md"
-    card_path.write_text("content")
+    card_path = tmp_path / "card.md"
+    card_path.write_text("old")
+    
+    _write_file_atomic(card_path, "new ✓".encode('utf-8'))
+    
+    assert card_path.read_text(encoding='utf-8') == "new ✓"
+    assert list(tmp_path.iterdir()) == [card_path]
+
+
+def test_is_board_enabled(monkeypatch: "MonkeyPatch", tmp_path: Path) -> None:
+    """Test is_board_enabled reads config without needing credentials."""
+    (tmp_path / 'trello-sync.yaml').write_text(
+        'boards:\n'
+        '  - board_id: enabled_board\n'
+        '    enabled: true\n'
+        '  - board_id: default_board\n'
+        '  - board_id: disabled_board\n'
+        '    enabled: false\n',
+        encoding='utf-8',
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('TRELLO_API_KEY', raising=False)
+    
+    assert TrelloSync.is_board_enabled('enabled_board') is True
+    assert TrelloSync.is_board_enabled('default_board') is True
+    assert TrelloSync.is_board_enabled('disabled_board') is False
+    assert TrelloSync.is_board_enabled('unknown_board') is False
+
+
+def _fake_trello_request(
+    self: TrelloSync,
+    method: str,
+    endpoint: str,
+    params: dict | None = None,
+    use_cached: bool = True,
+) -> object:
+    """Answer Trello API requests for a board with one list and one card."""
+    responses = {
+        'boards/board1/lists': [{'id': 'list1', 'name': 'To Do'}],
+        'lists/list1/cards': [
+            {'id': 'card1', 'name': 'First Card', 'dateLastActivity': '2020-01-20T12:00:00.000Z'},
+        ],
+        'cards/card1': {
+            'id': 'card1',
+            'name': 'First Card',
+            'desc': 'Card description',
+            'dateLastActivity': '2020-01-20T12:00:00.000Z',
+            'actions': [],
+            'attachments': [],
+            'labels': [],
+            'members': [],
+            'checklists': [],
+        },
+    }
+    return responses.get(endpoint, [])
+
+
+def test_sync_board(
+    sync: TrelloSync, monkeypatch: "MonkeyPatch", tmp_path: Path
+) -> None:
+    """Test sync_board writes new cards and skips them once up to date."""
+    board_config = {
+        'board_id': 'board1',
+        'enabled': True,
+        'target_path': '{org}/{board}/{column}/{card}.md',
+        'assets_folder': 'assets/{org}/{board}',
+    }
+    monkeypatch.setattr('trello_sync.services.trello_sync.load_config', lambda: {})
+    monkeypatch.setattr(
+        'trello_sync.services.trello_sync.get_board_config', lambda *args, **kwargs: board_config
+    )
+    monkeypatch.setattr(
+        'trello_sync.services.trello_sync.get_obsidian_root', lambda *args, **kwargs: tmp_path
+    )
+    monkeypatch.setattr(TrelloSync, '_request', _fake_trello_request)
+    
+    stats = sync.sync_board('board1', board_name='My Board', workspace_name='My Org')
+    
+    assert stats == {'total_cards': 1, 'synced_cards': 1, 'skipped_cards': 0}
+    card_path = tmp_path / 'my-org' / 'my-board' / 'to-do' / 'first-card.md'
+    assert '# First Card' in card_path.read_text(encoding='utf-8')
+    
+    stats = sync.sync_board('board1', board_name='My Board', workspace_name='My Org')
+    assert stats == {'total_cards': 1, 'synced_cards': 0, 'skipped_cards': 1}
+
+
+def test_get_full_card_single_request(sync: TrelloSync, mocker: "MockerFixture") -> None:
+    """Test card details, comments and attachments come from one request."""
+    mock_request = mocker.patch.object(
+        TrelloSync,
+        '_request',
+        return_value={
+            'id': 'card1',
+            'actions': [{'type': 'commentCard', 'data': {'text': 'Hi'}}],
+            'attachments': [{'id': 'att1'}],
+        },
+    )
+    
+    card = sync._get_full_card('card1')
+    
+    mock_request.assert_called_once()
+    assert mock_request.call_args[0][1] == 'cards/card1'
+    assert card['comments'] is card['actions']
+    assert card['attachments'] == [{'id': 'att1'}]
+    assert card['checklists'] == []
+
+
+def test_get_full_card_leaves_cached_response_unchanged(
+    sync: TrelloSync, mocker: "MockerFixture"
+) -> None:
+    """Test the compatibility keys are added to a copy, not the cached response."""
+    response = {'id': 'card1', 'actions': [{'type': 'commentCard'}]}
+    mocker.patch.object(TrelloSync, '_request', return_value=response)
+    
+    card = sync._get_full_card('card1')
+    
+    assert card['comments'] is card['actions']
+    assert response == {'id': 'card1', 'actions': [{'type': 'commentCard'}]}
+
+
+def test_trello_sync_session_adapter(sync: TrelloSync) -> None:
+    """Test the session pools connections and retries transient errors."""
+    adapter = sync.session.get_adapter('https://api.trello.com/1/boards')
+    
+    assert adapter._pool_maxsize == 10
+    assert adapter.max_retries.total == 3
+    assert 429 in adapter.max_retries.status_forcelist
+
+
+def test_scan_file_mtimes(tmp_path: Path) -> None:
+    """Test _scan_file_mtimes lists files only and tolerates missing directories."""
+    from trello_sync.services.trello_sync import _scan_file_mtimes
+    
+    card_file = tmp_path / 'card.md'
+    card_file.write_text('content', encoding='utf-8')
+    (tmp_path / 'subdir').mkdir()
+    
+    assert _scan_file_mtimes(str(tmp_path)) == {'card.md': card_file.stat().st_mtime}
+    assert _scan_file_mtimes(str(tmp_path / 'missing')) == {}
+
+
+def test_sync_board_fetches_board_once(
+    sync: TrelloSync, monkeypatch: "MonkeyPatch", tmp_path: Path
+) -> None:
+    """Test sync_board fetches the board once when name and workspace are missing."""
+    board_config = {'board_id': 'board1', 'enabled': True, 'assets_folder': 'assets'}
+    monkeypatch.setattr('trello_sync.services.trello_sync.load_config', lambda: {})
+    monkeypatch.setattr(
+        'trello_sync.services.trello_sync.get_board_config', lambda *args, **kwargs: board_config
+    )
+    monkeypatch.setattr(
+        'trello_sync.services.trello_sync.get_obsidian_root', lambda *args, **kwargs: tmp_path
+    )
+    get_board = MagicMock(return_value={'name': 'My Board', 'organization': {'displayName': 'My Org'}})
+    monkeypatch.setattr(TrelloSync, 'get_board', get_board)
+    monkeypatch.setattr(TrelloSync, '_request', _fake_trello_request)
+    
+    stats = sync.sync_board('board1', dry_run=True)
     
-    # File is newer than card update (should not sync)
-    assert sync.should_sync_card(card_path, "2020-01-20T12:00:00Z") is False
+    get_board.assert_called_once_with('board1')
+    assert stats == {'total_cards': 1, 'synced_cards': 1, 'skipped_cards': 0}
+
 
+def test_generate_watching_file_looks_up_each_board_once(
+    sync: TrelloSync,
+    monkeypatch: "MonkeyPatch", tmp_path: Path
+) -> None:
+    """Test generate_watching_file fetches lists once per board and links local cards."""
+    config = {
+        'obsidian_root': str(tmp_path),
+        'boards': [{'board_id': 'board1', 'enabled': True, 'workspace_name': 'My Org'}],
+    }
+    card_file = tmp_path / '20_tasks' / 'Trello' / 'my-org' / 'my-board' / 'to-do' / 'card-one.md'
+    card_file.parent.mkdir(parents=True)
+    card_file.touch()
+    watched_cards = [
+        {'name': 'Card One', '_board_id': 'board1', '_board_name': 'My Board', 'idList': 'list1'},
+        {'name': 'Card Two', '_board_id': 'board1', '_board_name': 'My Board', 'idList': 'list1'},
+    ]
+    monkeypatch.setattr('trello_sync.services.trello_sync.load_config', lambda: config)
+    monkeypatch.setattr(TrelloSync, 'get_watched_cards', lambda self: list(watched_cards))
+    get_board_lists = MagicMock(return_value=[{'id': 'list1', 'name': 'To Do'}])
+    monkeypatch.setattr(TrelloSync, 'get_board_lists', get_board_lists)
+    
+    output_path, count = sync.generate_watching_file(tmp_path / 'watching.md')
+    
+    get_board_lists.assert_called_once_with('board1')
+    assert count == 2
+    content = output_path.read_text(encoding='utf-8')
+    assert '[Card One](20_tasks/Trello/my-org/my-board/to-do/card-one.md)' in content
+    assert '| Card Two | My Board |' in content